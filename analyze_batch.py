@@ -1,20 +1,48 @@
 from pathlib import Path
-import json, csv
+import argparse
+import csv
+import os
 from othello_engine import analyze_game
+from othello_store import GameStore
 import matplotlib.pyplot as plt
 
 GAMES_DIR = Path(__file__).parent / "games"
 REPORTS_DIR = Path(__file__).parent / "reports"
 REPORTS_DIR.mkdir(exist_ok=True)
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--db", default=os.getenv("OTHELLO_STORE_PATH", GAMES_DIR / "games.sqlite3"),
+                    help="almacén de partidas del servidor (OTHELLO_STORE_PATH)")
+parser.add_argument("--server", help="URL /rpc de mcp_othello_server: analiza en lotes JSON-RPC en vez de localmente")
+parser.add_argument("--batch-size", type=int, default=100, help="partidas por petición con --server")
+args = parser.parse_args()
+
+store, games = GameStore(args.db), []
+while True:
+    page = store.find(limit=500, offset=len(games))
+    if not page: break
+    games.extend((g["game_id"], store.get(g["game_id"])["moves"]) for g in page)
+summaries = []
+if args.server:
+    from mcp_client import call_mcp_batch
+    for i in range(0, len(games), args.batch_size):
+        chunk = games[i:i+args.batch_size]
+        # por game_id: el servidor guarda el análisis en la misma partida, no en una copia
+        calls = [("analyze_game", {"game_id": gid, "max_depth": 3}) for gid, _ in chunk]
+        for (gid, _), resp in zip(chunk, call_mcp_batch(args.server, calls)):
+            if "error" in resp:
+                raise RuntimeError(f"{gid}: {resp['error']}")
+            summaries.append(resp["result"]["analysis_summary"]["summary"])
+else:
+    for gid, moves in games:
+        result = analyze_game(gid, moves, max_depth=3)
+        store.set_analysis(gid, result)
+        summaries.append(result["summary"])
+
 rows = []
-for f in GAMES_DIR.glob("*.json"):
-    data = json.loads(f.read_text(encoding="utf-8"))
-    moves = data.get("moves", [])
-    res = analyze_game(moves, max_depth=3)
-    summary = res.get("summary", {})
+for (gid, moves), summary in zip(games, summaries):
     rows.append({
-        "file": f.name,
+        "game_id": gid,
         "moves": len(moves),
         "errors_count": summary.get("errors_count", 0),
         "first_error_index": summary.get("first_error_index", None)
@@ -22,12 +50,12 @@ for f in GAMES_DIR.glob("*.json"):
 
 csv_path = REPORTS_DIR / "batch_summary.csv"
 with csv_path.open("w", newline='', encoding="utf-8") as fh:
-    writer = csv.DictWriter(fh, fieldnames=["file","moves","errors_count","first_error_index"])
+    writer = csv.DictWriter(fh, fieldnames=["game_id","moves","errors_count","first_error_index"])
     writer.writeheader()
     writer.writerows(rows)
 
 # Chart
-files = [r["file"] for r in rows]
+files = [r["game_id"] for r in rows]
 errors = [r["errors_count"] for r in rows]
 plt.figure(figsize=(8,4))
 plt.bar(range(len(files)), errors)
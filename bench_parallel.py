@@ -0,0 +1,50 @@
+"""Benchmark de la búsqueda paralela en la raíz: tiempo y speedup por número de procesos.
+
+Uso:
+    python bench_parallel.py                      # profundidad 6, 1/2/4/8 procesos
+    python bench_parallel.py --depth 7 --workers 1 4 8 --shared-bound
+"""
+import argparse
+import os
+import time
+
+from bench_search import bench_positions
+from othello_engine import get_search_pool, search
+
+MIDGAME = ("early_mid", "midgame", "midgame2")
+
+def run(depth, workers_list, deterministic=True):
+    rows = []
+    reference = {}
+    for workers in workers_list:
+        if workers > 1:
+            get_search_pool(workers)  # arranque de procesos fuera de la medición
+        nodes = 0
+        t0 = time.perf_counter()
+        for name, board, player in bench_positions():
+            if name not in MIDGAME: continue
+            res = search(board, player, depth, workers=workers, deterministic=deterministic)
+            nodes += res["nodes"]
+            # todas las configuraciones deben dar el mismo valor
+            if reference.setdefault(name, res["score"]) != res["score"]:
+                raise AssertionError(f"{name}: score {res['score']} != {reference[name]}")
+        rows.append({"workers": workers, "nodes": nodes,
+                     "seconds": round(time.perf_counter() - t0, 3)})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--shared-bound", action="store_true",
+                        help="comparte la cota entre procesos (no determinista)")
+    args = parser.parse_args()
+    print(f"CPUs: {os.cpu_count()}  depth: {args.depth}")
+    rows = run(args.depth, args.workers, deterministic=not args.shared_bound)
+    base = rows[0]["seconds"]
+    print(f"{'workers':>7} {'nodes':>10} {'seconds':>8} {'speedup':>8}")
+    for r in rows:
+        print(f"{r['workers']:>7} {r['nodes']:>10} {r['seconds']:>8} {base/r['seconds']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Suite de rendimiento por backend: perft (hojas por profundidad contra valores de referencia)
+y nodos/segundo de negamax a profundidad fija. Salida en tabla o JSON para seguir regresiones.
+
+Uso:
+    python bench_perft.py                                  # todos los backends
+    python bench_perft.py --backend bitboard --perft-depth 8 --search-depth 6
+    python bench_perft.py --json results/$(date +%F).json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+from bench_search import BENCH_POSITIONS
+from othello_engine import BACKENDS, BLACK, SearchContext, negamax, new_board, perft
+
+# Posiciones como secuencias de jugadas (pases implícitos) y hojas esperadas para depth 1..N.
+# "start" son los valores publicados; el resto se verificó con los backends bitboard y list.
+PERFT_POSITIONS = {
+    "start": ([], [4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284]),
+    "midgame": (BENCH_POSITIONS["midgame"], [11, 130, 1461, 17378, 201382]),
+    "midgame2": (BENCH_POSITIONS["midgame2"], [12, 189, 2109, 32403, 370614]),
+    # partida que termina por aniquilación al quinto ply: hojas terminales
+    "wipeout": (["d3", "c3", "f5", "f4"], [5, 34, 205, 1492, 10899, 90604, 758675]),
+    # final con pases forzados y partidas que terminan antes de la profundidad pedida
+    "endgame_passes": (
+        ["c4", "c3", "c2", "c5", "e6", "b2", "a1", "f5", "g6", "g5", "g4", "e3", "f4", "c1", "b5",
+         "f7", "f2", "h5", "h7", "c6", "h6", "a6", "d2", "h8", "b4", "d3", "c7", "f3", "a4", "f1",
+         "e2", "c8", "e7", "d1", "d7", "a5", "a7", "d6", "a3", "b3", "h3", "b6", "d8", "f8", "g1",
+         "g3", "h2", "b7", "a2", "f6", "b1", "g2", "e1"],
+        [1, 6, 11, 29, 57, 86, 125, 133, 141]),
+}
+SEARCH_POSITIONS = ("start", "opening", "early_mid", "midgame", "midgame2")
+
+def position(moves, backend=None):
+    """(tablero, jugador al turno) tras `moves`, con pases implícitos."""
+    b, p = new_board(backend), BLACK
+    for mv in moves:
+        if not b.has_any_move(p): p = -p
+        if not b.apply_move(mv, p): raise ValueError(f"illegal move {mv}")
+        p = -p
+    if not b.has_any_move(p) and b.has_any_move(-p): p = -p
+    return b, p
+
+def run_perft(backend, max_depth):
+    rows = []
+    for name, (moves, expected) in PERFT_POSITIONS.items():
+        board, player = position(moves, backend)
+        for depth in range(1, min(max_depth, len(expected)) + 1):
+            t0 = time.perf_counter()
+            leaves = perft(board, player, depth)
+            seconds = time.perf_counter() - t0
+            rows.append({"position": name, "depth": depth, "leaves": leaves,
+                         "expected": expected[depth-1], "ok": leaves == expected[depth-1],
+                         "seconds": round(seconds, 4),
+                         "leaves_per_second": round(leaves / seconds) if seconds else None})
+    return rows
+
+def run_search(backend, depth):
+    """negamax sin tabla de transposición a profundidad fija: nodos, tiempo y nodos/segundo."""
+    rows = []
+    for name in SEARCH_POSITIONS:
+        board, player = position(BENCH_POSITIONS[name], backend)
+        ctx = SearchContext()
+        t0 = time.perf_counter()
+        score, _, _ = negamax(board, depth, player, -1e9, 1e9, None, ctx)
+        seconds = time.perf_counter() - t0
+        rows.append({"position": name, "depth": depth, "score": score, "nodes": ctx.nodes,
+                     "seconds": round(seconds, 4), "nps": round(ctx.nodes / seconds) if seconds else None})
+    return rows
+
+def run(backends, perft_depth=6, search_depth=5):
+    result = {"timestamp": datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "perft_depth": perft_depth, "search_depth": search_depth, "backends": {}}
+    for backend in backends:
+        perft_rows = run_perft(backend, perft_depth)
+        search_rows = run_search(backend, search_depth)
+        nodes = sum(r["nodes"] for r in search_rows)
+        seconds = sum(r["seconds"] for r in search_rows)
+        result["backends"][backend] = {
+            "perft": perft_rows, "search": search_rows,
+            "perft_ok": all(r["ok"] for r in perft_rows),
+            "search_nodes": nodes, "search_seconds": round(seconds, 4),
+            "search_nps": round(nodes / seconds) if seconds else None}
+    return result
+
+def print_report(result):
+    for backend, data in result["backends"].items():
+        print(f"== {backend}  perft {'OK' if data['perft_ok'] else 'FALLA'}  "
+              f"search {data['search_nodes']} nodos en {data['search_seconds']}s "
+              f"({data['search_nps']} nodos/s)")
+        for r in data["perft"]:
+            if r["depth"] == max(x["depth"] for x in data["perft"] if x["position"] == r["position"]) \
+                    or not r["ok"]:
+                flag = "" if r["ok"] else f"  esperado {r['expected']}"
+                print(f"   perft {r['position']:<15} d{r['depth']:<2} {r['leaves']:>10} "
+                      f"{r['seconds']:>8}s{flag}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--perft-depth", type=int, default=6)
+    parser.add_argument("--search-depth", type=int, default=5)
+    parser.add_argument("--json", help="archivo de salida JSON ('-' = stdout)")
+    args = parser.parse_args()
+    result = run(args.backend, args.perft_depth, args.search_depth)
+    if args.json == "-":
+        json.dump(result, sys.stdout, indent=2)
+    else:
+        print_report(result)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(result, fh, indent=2)
+    if not all(d["perft_ok"] for d in result["backends"].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
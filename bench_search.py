@@ -0,0 +1,79 @@
+"""Benchmark de la búsqueda: nodos visitados por profundidad sobre un conjunto fijo de posiciones.
+
+Uso:
+    python bench_search.py                 # ordenación de jugadas: sin vs con
+    python bench_search.py --depths 2 6
+    python bench_search.py --window        # alpha-beta vs PVS y ventanas de aspiración
+
+La columna "same" cuenta las posiciones con el mismo score que la primera variante.
+"""
+import argparse
+import time
+
+from othello_engine import ASPIRATION_WINDOW, BLACK, WHITE, board_after_moves, search
+
+# Posiciones fijas (apertura, medio juego temprano y medio juego) como secuencias de jugadas.
+BENCH_POSITIONS = {
+    "start": [],
+    "opening": ["d3", "c5", "f6", "f5", "e6", "e3"],
+    "early_mid": ["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4", "b5", "c6"],
+    "midgame": ["f5", "d6", "c3", "d3", "c4", "f4", "c5", "b3", "c2", "e3", "d2", "c6", "b4", "a4"],
+    "midgame2": ["c4", "e3", "f6", "e6", "f5", "c5", "f4", "g6", "f7", "d3", "f3", "g5", "g4", "e7",
+                 "c6", "d6"],
+}
+
+# Variantes comparadas: nombre -> kwargs para search()
+VARIANTS = {
+    "no_ordering": {"ordering": False},
+    "ordering": {"ordering": True},
+}
+
+# Ventanas de búsqueda: alpha-beta completa vs PVS/NegaScout y aspiración
+WINDOW_VARIANTS = {
+    "alphabeta": {},
+    "pvs": {"pvs": True},
+    "aspiration": {"aspiration": ASPIRATION_WINDOW},
+    "pvs+aspiration": {"pvs": True, "aspiration": ASPIRATION_WINDOW},
+}
+
+def bench_positions():
+    for name, moves in BENCH_POSITIONS.items():
+        board = board_after_moves(moves)
+        player = BLACK if len(moves) % 2 == 0 else WHITE
+        yield name, board, player
+
+def run(depths, variants=VARIANTS):
+    """Devuelve filas {variant, depth, nodes, seconds, scores} sumadas sobre todas las posiciones."""
+    rows = []
+    for depth in depths:
+        for vname, kwargs in variants.items():
+            nodes, scores = 0, []
+            t0 = time.perf_counter()
+            for _, board, player in bench_positions():
+                res = search(board, player, depth, **kwargs)
+                nodes += res["nodes"]
+                scores.append(res["score"])
+            rows.append({"variant": vname, "depth": depth, "nodes": nodes,
+                         "seconds": round(time.perf_counter() - t0, 3), "scores": scores})
+    return rows
+
+def print_table(rows):
+    base = {}
+    print(f"{'depth':>5} {'variant':<14} {'nodes':>10} {'seconds':>8} {'vs first':>9} {'same':>5}")
+    for r in rows:
+        ref = base.setdefault(r["depth"], r)
+        same = sum(a == b for a, b in zip(r["scores"], ref["scores"]))
+        print(f"{r['depth']:>5} {r['variant']:<14} {r['nodes']:>10} {r['seconds']:>8} "
+              f"{r['nodes']/ref['nodes']:>8.2f}x {same:>2}/{len(r['scores'])}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depths", type=int, nargs=2, default=[2, 6], metavar=("MIN", "MAX"))
+    parser.add_argument("--window", action="store_true",
+                        help="compara alpha-beta, PVS y ventanas de aspiración")
+    args = parser.parse_args()
+    variants = WINDOW_VARIANTS if args.window else VARIANTS
+    print_table(run(range(args.depths[0], args.depths[1] + 1), variants))
+
+if __name__ == "__main__":
+    main()
@@ -22,3 +22,17 @@ def call_mcp(endpoint: str, method: str, params: Dict[str, Any] = None, timeout:
     if "error" in resp:
         raise RuntimeError(f"MCP error: {resp['error']}")
     return resp.get("result")
+
+def call_mcp_batch(endpoint: str, calls, timeout: int = 600):
+    """
+    Envía varias llamadas en un solo lote JSON-RPC; `calls` es una lista de (method, params).
+    Devuelve las respuestas en el mismo orden (cada una con "result" o "error").
+    """
+    payload = [{"jsonrpc": "2.0", "id": i, "method": method, "params": params or {}}
+               for i, (method, params) in enumerate(calls)]
+    if not payload:
+        return []
+    headers = {"Content-Type": "application/json"}
+    r = requests.post(endpoint, json=payload, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return sorted(r.json(), key=lambda resp: resp["id"])
@@ -1,13 +1,26 @@
-from fastapi import FastAPI, Request, HTTPException 
+from fastapi import FastAPI, Request, HTTPException, Response
 from pathlib import Path
+import asyncio
+import atexit
 import json
 import uuid
 from datetime import datetime
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from othello_engine import analyze_game, board_after_moves, generate_random_game
+from othello_engine import (analyze_game, board_after_moves, generate_random_game, TranspositionTable,
+                            MAX_SEARCH_DEPTH, CancelToken, SearchCancelled)
+from othello_book import OpeningBook
+from othello_cache import ResultCache
+from othello_record import is_record_file, load_game, read_game_file
+from othello_store import GameStore
 
-# PNG generation
+# PNG generation (Agg: los reportes se dibujan en los hilos de jobs)
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -22,8 +35,47 @@ for d in (GAMES_DIR, REPORTS_DIR):
 
 app = FastAPI(title="Othello MCP Server", version="0.1")
 
-# store minimal in-memory map: game_id -> {moves, metadata, analysis}
-GAMES = {}
+# persistent game store (SQLite, WAL) with a bounded in-memory cache of recently used games
+GAMES = GameStore(os.getenv("OTHELLO_STORE_PATH", GAMES_DIR / "games.sqlite3"),
+                  hot_size=int(os.getenv("OTHELLO_STORE_HOT_SIZE", 1024)))
+
+# root-parallel search processes per request (1 = serial)
+SEARCH_WORKERS = int(os.getenv("OTHELLO_SEARCH_WORKERS", 1))
+# clients may ask for fewer processes, never more: each distinct value keeps its own pool alive
+MAX_SEARCH_WORKERS = SEARCH_WORKERS or os.cpu_count() or 1
+
+# transposition table shared by every search of this server process
+ENGINE_TT = TranspositionTable(size=int(os.getenv("OTHELLO_TT_SIZE", 1 << 20)),
+                               policy=os.getenv("OTHELLO_TT_POLICY", "depth"))
+
+# server-wide cache of search results by position, shared by every game (0 bytes = disabled);
+# with OTHELLO_CACHE_PATH it is loaded at startup and saved at exit
+CACHE_BYTES = int(os.getenv("OTHELLO_CACHE_BYTES", 64 << 20))
+RESULT_CACHE = ResultCache(CACHE_BYTES, os.getenv("OTHELLO_CACHE_PATH")) if CACHE_BYTES else None
+if RESULT_CACHE is not None and RESULT_CACHE.path is not None:
+    atexit.register(RESULT_CACHE.save)
+
+# background jobs (analyze_game/simulate/export_report) run in a bounded thread pool, off the
+# event loop: job_id -> job dict (see submit_job); finished jobs are kept for job_result.
+# Threads share the GIL: concurrent jobs keep the server responsive but do not add CPU (searches
+# use OTHELLO_SEARCH_WORKERS processes for that)
+JOB_WORKERS = int(os.getenv("OTHELLO_JOB_WORKERS", 2))
+JOB_HISTORY = int(os.getenv("OTHELLO_JOB_HISTORY", 1000))
+JOB_POOL = ThreadPoolExecutor(JOB_WORKERS, thread_name_prefix="othello-job")
+JOBS = {}
+JOB_PENDING = ("queued", "running")
+PLOT_LOCK = threading.Lock()  # pyplot no es seguro entre hilos
+# calls of one JSON-RPC batch running at the same time
+BATCH_CONCURRENCY = int(os.getenv("OTHELLO_BATCH_CONCURRENCY", JOB_WORKERS))
+# per-request search deadline of the synchronous methods; below the 60 s timeout of our clients
+# (call_mcp) by default
+REQUEST_DEADLINE_MS = float(os.getenv("OTHELLO_REQUEST_DEADLINE_MS", 55000)) or None
+DISCONNECT_POLL_S = 0.25
+SEARCH_CANCELLED = -32001
+
+# optional opening book (see othello_book.py), consulted before searching
+BOOK_PATH = os.getenv("OTHELLO_BOOK_PATH")
+OPENING_BOOK = OpeningBook(BOOK_PATH) if BOOK_PATH and Path(BOOK_PATH).exists() else None
 
 def board_to_png_matrix(board_matrix, path: Path):
     fig, ax = plt.subplots(figsize=(4,4))
@@ -49,6 +101,114 @@ def board_to_png_matrix(board_matrix, path: Path):
     plt.savefig(str(path), dpi=150)
     plt.close(fig)
 
+def search_options(params):
+    """max_depth/time_ms/max_nodes/workers/endgame_*/stats/multipv de los params. Con time_ms y
+    sin max_depth la profundidad sólo la limita el reloj (profundización iterativa). `workers`
+    se limita a MAX_SEARCH_WORKERS y, salvo `deterministic`, comparten la mejor cota."""
+    time_ms = params.get("time_ms")
+    max_nodes = params.get("max_nodes")
+    default_depth = MAX_SEARCH_DEPTH if time_ms is not None else 4
+    max_depth = int(params.get("max_depth", default_depth))
+    if max_depth < 1:
+        raise Exception("max_depth must be >= 1")
+    opts = {"max_depth": max_depth,
+            "time_ms": float(time_ms) if time_ms is not None else None,
+            "max_nodes": int(max_nodes) if max_nodes is not None else None,
+            "workers": max(1, min(int(params.get("workers", SEARCH_WORKERS)), MAX_SEARCH_WORKERS)),
+            "deterministic": bool(params.get("deterministic", False))}
+    if params.get("endgame_empties") is not None:
+        opts["endgame_empties"] = int(params["endgame_empties"])
+    if params.get("endgame_mode"):
+        opts["endgame_mode"] = params["endgame_mode"]
+    if params.get("stats"):
+        opts["stats"] = True
+    if params.get("multipv") is not None:
+        opts["multipv"] = max(int(params["multipv"]), 1)
+    return opts
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+def job_view(job):
+    """Estado público del job (sin resultado)."""
+    return {k: job[k] for k in ("job_id", "method", "status", "submitted", "started", "finished",
+                                "elapsed_ms", "error")}
+
+def _run_job(job, params):
+    """Cuerpo del hilo trabajador: ejecuta el método con el CancelToken del job."""
+    if job["cancel"].cancelled:
+        job.update(status="cancelled", finished=_now())
+        return
+    job.update(status="running", started=_now())
+    t0 = time.perf_counter()
+    try:
+        result = JOB_METHODS[job["method"]](params, job["cancel"])
+        result["job_id"] = job["job_id"]
+        job.update(result=result, status="done")
+    except SearchCancelled:
+        job["status"] = "cancelled"
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job["job_id"], job["method"])
+        job.update(status="error", error=str(e))
+    job.update(finished=_now(), elapsed_ms=round((time.perf_counter() - t0) * 1000.0, 3))
+
+def submit_job(method, params, deadline_ms=None):
+    """Encola `method` (JOB_METHODS) y devuelve el job sin esperar. `params["job_id"]` fija el id;
+    `deadline_ms` lo cancela pasado ese tiempo desde el envío (cola incluida)."""
+    if method not in JOB_METHODS:
+        raise Exception(f"method {method} cannot run as a job")
+    job_id = str(params.get("job_id") or uuid.uuid4())
+    if job_id in JOBS and JOBS[job_id]["status"] in JOB_PENDING:
+        raise Exception(f"job_id {job_id} already running")
+    JOBS.pop(job_id, None)
+    job = {"job_id": job_id, "method": method, "status": "queued", "submitted": _now(),
+           "started": None, "finished": None, "elapsed_ms": None, "error": None, "result": None,
+           "cancel": CancelToken(float(deadline_ms) if deadline_ms else None)}
+    JOBS[job_id] = job
+    # olvida los jobs terminados más antiguos
+    done = [k for k, j in JOBS.items() if j["status"] not in JOB_PENDING]
+    for k in done[:max(len(done) - JOB_HISTORY, 0)]:
+        del JOBS[k]
+    job["future"] = asyncio.get_running_loop().run_in_executor(JOB_POOL, _run_job, job, params)
+    return job
+
+def cancel_job(job):
+    """Cancela el job; uno en cola queda cancelado sin llegar a ejecutarse."""
+    job["cancel"].cancel()
+    if job["status"] == "queued":
+        job.update(status="cancelled", finished=_now())
+
+async def wait_job(job, timeout_s=None, request=None):
+    """Espera a que el job termine o a `timeout_s`; con `request`, lo cancela si el cliente se
+    desconecta."""
+    end = time.monotonic() + timeout_s if timeout_s is not None else None
+    while job["status"] in JOB_PENDING:
+        if job["status"] == "queued" and job["cancel"].cancelled:
+            cancel_job(job)  # vencido en la cola
+            break
+        wait = DISCONNECT_POLL_S if end is None else min(DISCONNECT_POLL_S, end - time.monotonic())
+        if wait <= 0: break
+        await asyncio.wait({job["future"]}, timeout=wait)
+        if job["status"] in JOB_PENDING and request is not None and await request.is_disconnected():
+            logger.info("client disconnected, cancelling job %s", job["job_id"])
+            cancel_job(job)
+    return job
+
+def job_outcome(job):
+    """Resultado del job terminado: SearchCancelled si se canceló, Exception si falló."""
+    if job["status"] == "cancelled":
+        raise SearchCancelled()
+    if job["status"] == "error":
+        raise Exception(job["error"])
+    return job["result"]
+
+async def call_job(method, params, request=None):
+    """Camino síncrono: ejecuta el job en el pool y espera su resultado, con `deadline_ms` (o
+    REQUEST_DEADLINE_MS) como límite y cancelándolo si el cliente se desconecta."""
+    job = submit_job(method, params, params.get("deadline_ms", REQUEST_DEADLINE_MS))
+    await wait_job(job, request=request)
+    return job_outcome(job)
+
 def make_jsonrpc_error(id_, code, message):
     return {"jsonrpc":"2.0", "id": id_, "error":{"code":code, "message":message}}
 
@@ -58,9 +218,34 @@ def make_jsonrpc_result(id_, result):
 @app.post("/rpc")
 async def rpc(request: Request):
     payload = await request.json()
-    logger.info("RPC request: %s", payload.get("method"))
+    if isinstance(payload, list):
+        return await rpc_batch(payload, request)
     if not isinstance(payload, dict) or payload.get("jsonrpc") != "2.0":
         raise HTTPException(status_code=400, detail="Invalid JSON-RPC envelope")
+    response = await dispatch(payload, request)
+    return response if "id" in payload else Response(status_code=204)  # notificación
+
+async def rpc_batch(calls, request: Request):
+    """Lote JSON-RPC: ejecuta las llamadas a la vez (hasta BATCH_CONCURRENCY; las búsquedas
+    además comparten el pool de jobs) y responde en el orden del lote, sin las notificaciones."""
+    if not calls:
+        return make_jsonrpc_error(None, -32600, "Invalid Request: empty batch")
+    logger.info("RPC batch: %d calls", len(calls))
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def one(call):
+        if not isinstance(call, dict) or call.get("jsonrpc") != "2.0":
+            return make_jsonrpc_error(None, -32600, "Invalid Request")
+        async with limit:
+            response = await dispatch(call, request)
+        return response if "id" in call else None
+
+    responses = [r for r in await asyncio.gather(*(one(c) for c in calls)) if r is not None]
+    return responses if responses else Response(status_code=204)
+
+async def dispatch(payload, request: Request):
+    """Ejecuta una llamada JSON-RPC y devuelve su respuesta (resultado o error)."""
+    logger.info("RPC request: %s", payload.get("method"))
     method = payload.get("method")
     params = payload.get("params", {})
     id_ = payload.get("id")
@@ -71,17 +256,32 @@ async def rpc(request: Request):
         elif method == "load_game":
             result = await rpc_load_game(params)
             return make_jsonrpc_result(id_, result)
-        elif method == "analyze_game":
-            result = await rpc_analyze_game(params)
+        elif method in JOB_METHODS:
+            result = await call_job(method, params, request)
+            return make_jsonrpc_result(id_, result)
+        elif method == "submit":
+            result = await rpc_submit(params)
             return make_jsonrpc_result(id_, result)
-        elif method == "simulate":
-            result = await rpc_simulate(params)
+        elif method == "job_status":
+            result = await rpc_job_status(params)
             return make_jsonrpc_result(id_, result)
-        elif method == "export_report":
-            result = await rpc_export_report(params)
+        elif method == "job_result":
+            result = await rpc_job_result(params)
+            return make_jsonrpc_result(id_, result)
+        elif method == "cancel":
+            result = await rpc_cancel(params)
+            return make_jsonrpc_result(id_, result)
+        elif method == "find_games":
+            result = await rpc_find_games(params)
+            return make_jsonrpc_result(id_, result)
+        elif method == "engine_stats":
+            result = await rpc_engine_stats(params)
             return make_jsonrpc_result(id_, result)
         else:
             return make_jsonrpc_error(id_, -32601, f"Method {method} not found")
+    except SearchCancelled:
+        logger.info("RPC %s cancelled", method)
+        return make_jsonrpc_error(id_, SEARCH_CANCELLED, "Search cancelled")
     except Exception as e:
         logger.exception("Error handling RPC")
         return make_jsonrpc_error(id_, -32000, f"Internal error: {str(e)}")
@@ -95,32 +295,34 @@ async def rpc_fetch_game(params):
         p = Path(fp)
         if not p.exists():
             raise Exception(f"{fp} not found")
-        text = p.read_text(encoding="utf-8")
-        try:
-            payload = json.loads(text)
-            moves = payload.get("moves", [])
-            metadata = payload.get("metadata", {})
-        except Exception:
-            moves = [l.strip() for l in text.splitlines() if l.strip()]
-            metadata = {}
+        # JSON, una jugada por línea o binario (othello_record); `index` elige partida en archivos
+        index = int(params.get("index", 0))
+        if is_record_file(p):
+            game = load_game(p, index)
+        else:
+            games = read_game_file(p)
+            if not 0 <= index < len(games):
+                raise Exception(f"{fp} has no game {index}")
+            game = games[index]
+        moves = game["moves"]
+        metadata = game.get("metadata", {})
     elif source == "random":
         moves = generate_random_game()
         metadata = {"generated": True}
     else:
         raise Exception(f"Source {source} not implemented in this server")
 
-    gid = str(uuid.uuid4())
-    GAMES[gid] = {"moves": moves, "metadata": metadata, "created": datetime.utcnow().isoformat()}
-    (GAMES_DIR / f"{gid}.json").write_text(json.dumps({"moves":moves,"metadata":metadata}, indent=2), encoding="utf-8")
+    gid = GAMES.add(str(uuid.uuid4()), moves, metadata, source=source)
     return {"game_id": gid, "moves_count": len(moves), "source": source}
 
 async def rpc_load_game(params):
     return await rpc_fetch_game(params)
 
-async def rpc_analyze_game(params):
+# --- Métodos que se ejecutan como jobs (hilos del pool; `cancel` es el CancelToken del job) ---
+def job_analyze_game(params, cancel):
     gid = params.get("game_id")
     moves = params.get("moves")
-    max_depth = int(params.get("max_depth", 4))
+    opts = search_options(params)
     if not moves and gid:
         entry = GAMES.get(gid)
         if not entry:
@@ -128,18 +330,23 @@ async def rpc_analyze_game(params):
         moves = entry["moves"]
     if not moves:
         raise Exception("moves or game_id required")
-    result = analyze_game(moves, max_depth=max_depth)
+    result = analyze_game(gid, moves, tt=ENGINE_TT, book=OPENING_BOOK, cache=RESULT_CACHE,
+                          cancel=cancel, per_move=bool(params.get("per_move", True)), **opts)
     if gid:
-        GAMES[gid]["analysis"] = result
+        GAMES.set_analysis(gid, result)
     else:
-        gid = str(uuid.uuid4())
-        GAMES[gid] = {"moves": moves, "analysis": result, "metadata": {}, "created": datetime.utcnow().isoformat()}
-    return {"game_id": gid, "analysis_summary": result, "analysis_length": len(result.get("pv", []))}
+        gid = GAMES.add(str(uuid.uuid4()), moves, {}, source="analyze_game", analysis=result)
+    response = {"game_id": gid, "analysis_summary": result,
+                "analysis_length": len(result["analysis"]), "depth": result["depth"],
+                "solved": result["solved"]}
+    if "alternatives" in result: response["alternatives"] = result["alternatives"]
+    if "stats" in result: response["stats"] = result["stats"]
+    return response
 
-async def rpc_simulate(params):
+def job_simulate(params, cancel):
     gid = params.get("game_id")
     until = int(params.get("until_move", 0))
-    max_depth = int(params.get("max_depth", 4))
+    opts = search_options(params)
     if not gid:
         raise Exception("game_id required")
     entry = GAMES.get(gid)
@@ -147,18 +354,16 @@ async def rpc_simulate(params):
         raise Exception("game_id not found")
     moves = entry["moves"]
     partial = moves[:until]
-    from othello_engine import Board, find_best_move
-    b = Board()
-    player = 1
-    for m in partial:
-        if m and str(m).strip().lower()!="pass":
-            b.apply_move(m, player)
-        player = -player
-    best_move, pv, val = find_best_move(b, player, max_depth)
-    res = analyze_game(partial, max_depth=max_depth)
-    return {"game_id": gid, "until_move": until, "suggested_move": best_move, "pv": pv, "raw_analysis": res}
-
-async def rpc_export_report(params):
+    res = analyze_game(gid, partial, tt=ENGINE_TT, book=OPENING_BOOK, cache=RESULT_CACHE,
+                       per_move=False, cancel=cancel, **opts)
+    response = {"game_id": gid, "until_move": until,
+                "suggested_move": res["best_move"], "pv": res["pv"],
+                "depth": res["depth"], "solved": res["solved"], "raw_analysis": res}
+    if "alternatives" in res: response["alternatives"] = res["alternatives"]
+    if "stats" in res: response["stats"] = res["stats"]
+    return response
+
+def job_export_report(params, cancel):
     gid = params.get("game_id")
     fmt = params.get("format", "both")
     path = params.get("path", str(REPORTS_DIR))
@@ -167,7 +372,8 @@ async def rpc_export_report(params):
     entry = GAMES.get(gid)
     if not entry:
         raise Exception("game_id not found")
-    analysis = entry.get("analysis") or analyze_game(entry["moves"])
+    analysis = GAMES.analysis(gid) or analyze_game(gid, entry["moves"], tt=ENGINE_TT,
+                                                     cache=RESULT_CACHE, cancel=cancel)
     target_dir = Path(path)
     target_dir.mkdir(parents=True, exist_ok=True)
     base = target_dir / f"{gid}"
@@ -176,7 +382,8 @@ async def rpc_export_report(params):
     # --- CORRECCIÓN: usar .b para matriz interna ---
     board = board_after_moves(entry["moves"])
     png_path = base.with_suffix(".png")
-    board_to_png_matrix(board.b, png_path)
+    with PLOT_LOCK:
+        board_to_png_matrix(board.b, png_path)
     html_path = base.with_suffix(".html")
     html = f"""<html><head><meta charset='utf-8'><title>Othello Analysis {gid}</title></head><body>
     <h1>Othello Analysis {gid}</h1>
@@ -186,6 +393,65 @@ async def rpc_export_report(params):
     html_path.write_text(html, encoding="utf-8")
     return {"game_id": gid, "json": str(json_path), "html": str(html_path), "png": str(png_path)}
 
+async def rpc_find_games(params):
+    """Partidas guardadas por fecha (`created_after`/`created_before`, ISO), `source` y valores
+    exactos de `metadata`; `limit`/`offset` paginan (más recientes primero)."""
+    games = GAMES.find(params.get("created_after"), params.get("created_before"),
+                       params.get("source"), params.get("metadata"),
+                       min(int(params.get("limit", 100)), 1000), int(params.get("offset", 0)))
+    return {"games": games, "count": len(games)}
+
+JOB_METHODS = {"analyze_game": job_analyze_game, "simulate": job_simulate,
+               "export_report": job_export_report}
+
+# --- Jobs ---
+def _get_job(params):
+    job_id = params.get("job_id")
+    if not job_id:
+        raise Exception("job_id required")
+    job = JOBS.get(str(job_id))
+    if job is None:
+        raise Exception(f"job_id {job_id} not found")
+    return job
+
+async def rpc_submit(params):
+    """Encola {"method", "params"} y responde al momento con el job_id (ver job_status/job_result)."""
+    job_params = dict(params.get("params") or {})
+    if params.get("job_id"): job_params["job_id"] = params["job_id"]
+    job = submit_job(params.get("method"), job_params, params.get("deadline_ms"))
+    return job_view(job)
+
+async def rpc_job_status(params):
+    return job_view(_get_job(params))
+
+async def rpc_job_result(params):
+    """Resultado del job; `wait_ms` espera hasta ese tiempo. Sin terminar devuelve sólo el estado."""
+    job = _get_job(params)
+    if params.get("wait_ms"):
+        await wait_job(job, float(params["wait_ms"]) / 1000.0)
+    if job["status"] in JOB_PENDING:
+        return job_view(job)
+    return {**job_view(job), "result": job_outcome(job)}
+
+async def rpc_cancel(params):
+    """Cancela el job (en cola o en curso); quien lo espere recibe el error SEARCH_CANCELLED."""
+    if not params.get("job_id"):
+        raise Exception("job_id required")
+    job = JOBS.get(str(params["job_id"]))
+    cancelled = job is not None and job["status"] in JOB_PENDING
+    if cancelled: cancel_job(job)
+    return {"job_id": params["job_id"], "cancelled": cancelled}
+
+async def rpc_engine_stats(params):
+    if params.get("reset"):
+        ENGINE_TT.clear()
+    if RESULT_CACHE is not None:
+        if params.get("clear_cache"): RESULT_CACHE.clear()
+        if params.get("save_cache") and RESULT_CACHE.path is not None: RESULT_CACHE.save()
+    return {"transposition_table": ENGINE_TT.stats(), "game_store": GAMES.stats(),
+            "result_cache": RESULT_CACHE.stats() if RESULT_CACHE else None,
+            "opening_book": OPENING_BOOK.stats() if OPENING_BOOK else None}
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Othello MCP server running on http://0.0.0.0:8080/rpc")
@@ -0,0 +1,149 @@
+"""Generación de jugadas y evaluación vectorizada para muchos tableros a la vez (NumPy).
+
+Los tableros se representan como pares de bitboards uint64 (black, white), con la misma
+convención que othello_engine.Board (casilla (r,c) -> bit r*8+c). También se aceptan
+arrays (N, 8, 8) int8 con 1 = BLACK, -1 = WHITE, 0 = vacío.
+
+    black, white = as_bitboards(boards)          # (N,8,8) int8 -> 2 x (N,) uint64
+    moves = legal_moves(black, white, player)    # máscaras uint64
+    black2, white2, flips = apply_moves(black, white, player, squares)
+    scores = evaluate(black, white)              # igual que Board.evaluate
+"""
+import numpy as np
+
+from othello_engine import BLACK, WHITE, FULL_MASK, NOT_A_FILE, NOT_H_FILE, CORNERS_MASK
+
+_U = np.uint64
+_FULL = _U(FULL_MASK)
+_NOT_A = _U(NOT_A_FILE)
+_NOT_H = _U(NOT_H_FILE)
+_INNER = _U(NOT_A_FILE & NOT_H_FILE)
+_CORNERS = _U(CORNERS_MASK)
+_BIT_WEIGHTS = np.array([1 << i for i in range(64)], dtype=np.uint64)
+
+# (desplazamiento, a la izquierda?, máscara destino): mismas direcciones que el motor
+_DIRS = ((1, True, _NOT_A), (7, True, _NOT_H), (8, True, _FULL), (9, True, _NOT_A),
+         (1, False, _NOT_H), (7, False, _NOT_A), (8, False, _FULL), (9, False, _NOT_H))
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x):
+        return np.bitwise_count(np.asarray(x, dtype=np.uint64)).astype(np.int64)
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+    def popcount(x):
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BYTE_COUNTS[x.view(np.uint8).reshape(x.shape + (8,))].sum(axis=-1)
+
+def _shift(x, d, left, mask):
+    d = _U(d)
+    return (np.left_shift(x, d) if left else np.right_shift(x, d)) & mask
+
+# --- Conversión ---
+def as_bitboards(boards):
+    """(N, 8, 8) int8 -> (black, white) como arrays uint64 de forma (N,)."""
+    a = np.asarray(boards).reshape(-1, 64)
+    black = ((a == BLACK).astype(np.uint64) * _BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+    white = ((a == WHITE).astype(np.uint64) * _BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+    return black, white
+
+def to_arrays(black, white):
+    """(black, white) uint64 -> (N, 8, 8) int8."""
+    return (mask_to_array(black).astype(np.int8) - mask_to_array(white).astype(np.int8))
+
+def mask_to_array(masks):
+    """Máscaras uint64 (N,) -> (N, 8, 8) bool."""
+    masks = np.asarray(masks, dtype=np.uint64).reshape(-1, 1)
+    return ((masks & _BIT_WEIGHTS) != 0).reshape(-1, 8, 8)
+
+def from_boards(boards):
+    """Lista de othello_engine.Board -> (black, white)."""
+    black = np.array([b.black for b in boards], dtype=np.uint64)
+    white = np.array([b.white for b in boards], dtype=np.uint64)
+    return black, white
+
+def _own_opp(black, white, player):
+    black = np.asarray(black, dtype=np.uint64)
+    white = np.asarray(white, dtype=np.uint64)
+    is_black = np.asarray(player) == BLACK
+    return np.where(is_black, black, white), np.where(is_black, white, black)
+
+# --- Jugadas ---
+def moves_mask(own, opp):
+    """Versión vectorizada de othello_engine.moves_mask."""
+    own = np.asarray(own, dtype=np.uint64)
+    opp = np.asarray(opp, dtype=np.uint64)
+    inner = opp & _INNER
+    moves = np.zeros_like(own)
+    for d, left, mask in _DIRS:
+        m = opp if d == 8 else inner
+        t = m & _shift(own, d, left, _FULL)
+        for _ in range(5):
+            t |= m & _shift(t, d, left, _FULL)
+        moves |= _shift(t, d, left, _FULL)
+    return moves & ~(own | opp)
+
+def legal_moves(black, white, player=BLACK):
+    """Máscaras de jugadas legales; `player` escalar o array (N,) de BLACK/WHITE."""
+    own, opp = _own_opp(black, white, player)
+    return moves_mask(own, opp)
+
+def flips_mask(own, opp, squares):
+    """Discos volteados al jugar en `squares` (array (N,) de 0..63; -1 = pasar)."""
+    own = np.asarray(own, dtype=np.uint64)
+    opp = np.asarray(opp, dtype=np.uint64)
+    squares = np.asarray(squares, dtype=np.int64)
+    bit = np.where(squares >= 0, np.left_shift(_U(1), np.clip(squares, 0, 63).astype(np.uint64)),
+                   _U(0))
+    flips = np.zeros_like(own)
+    for d, left, mask in _DIRS:
+        run = np.zeros_like(own)
+        alive = np.ones(own.shape, dtype=bool)
+        x = _shift(bit, d, left, mask)
+        for _ in range(7):
+            flips |= np.where(alive & ((x & own) != 0), run, _U(0))
+            alive &= (x & opp) != 0
+            run |= np.where(alive, x, _U(0))
+            x = _shift(x, d, left, mask)
+    return flips
+
+def apply_moves(black, white, player, squares):
+    """Juega `squares` (uno por tablero, -1 = pasar) para `player`.
+
+    Devuelve (black, white, flips). Las jugadas ilegales no cambian el tablero y tienen
+    flips == 0.
+    """
+    black = np.asarray(black, dtype=np.uint64)
+    white = np.asarray(white, dtype=np.uint64)
+    own, opp = _own_opp(black, white, player)
+    squares = np.asarray(squares, dtype=np.int64)
+    empty = ~(own | opp)
+    bit = np.where(squares >= 0, np.left_shift(_U(1), np.clip(squares, 0, 63).astype(np.uint64)),
+                   _U(0))
+    flips = np.where((bit & empty) != 0, flips_mask(own, opp, squares), _U(0))
+    placed = np.where(flips != 0, bit, _U(0))
+    own = own | placed | flips
+    opp = opp & ~flips
+    is_black = np.asarray(player) == BLACK
+    return np.where(is_black, own, opp), np.where(is_black, opp, own), flips
+
+# --- Conteo y evaluación ---
+def counts(black, white):
+    """Array (N, 2) con discos [black, white]."""
+    return np.stack([popcount(black), popcount(white)], axis=-1)
+
+def evaluate(black, white):
+    """Misma heurística que Board.evaluate (punto de vista de BLACK)."""
+    black = np.asarray(black, dtype=np.uint64)
+    white = np.asarray(white, dtype=np.uint64)
+    disc_diff = popcount(black) - popcount(white)
+    corner_score = 25 * (popcount(black & _CORNERS) - popcount(white & _CORNERS))
+    mobility = popcount(moves_mask(black, white)) - popcount(moves_mask(white, black))
+    return disc_diff + 10 * mobility + corner_score
+
+def analyze_positions(boards, player=BLACK):
+    """Todo en una pasada para (N, 8, 8): jugadas (N,8,8) bool, conteos (N,2) y evaluación (N,)."""
+    black, white = as_bitboards(boards)
+    return {"legal_moves": mask_to_array(legal_moves(black, white, player)),
+            "counts": counts(black, white),
+            "evaluation": evaluate(black, white)}
@@ -0,0 +1,185 @@
+"""Libro de aperturas: archivo binario ordenado por hash de posición, leído con mmap.
+
+Formato (little endian):
+    cabecera  8s magic "OTHBOOK1" | I número de entradas | I plies | I profundidad de búsqueda
+    entradas  Q clave Zobrist (con turno) | B casilla de la jugada (255 = pasar) | B profundidad | h score
+Las entradas están ordenadas por clave; la búsqueda es binaria directamente sobre el mmap, así
+que varios procesos que abren el mismo archivo comparten las páginas sin copiarlas.
+
+Uso:
+    python othello_book.py build --out book.bin --plies 6 --depth 4
+    python othello_book.py build --out book.bin --plies 12 --depth 4 --games games/*.json
+    python othello_book.py probe --book book.bin d3 c5
+"""
+import argparse
+import json
+import mmap
+import struct
+import time
+from pathlib import Path
+
+from othello_engine import Board, BLACK, coords_to_move, move_to_coords, search
+
+MAGIC = b"OTHBOOK1"
+HEADER = struct.Struct("<8sIII")
+ENTRY = struct.Struct("<QBBh")
+NO_MOVE = 255
+
+class OpeningBook:
+    """Lector de solo lectura sobre mmap."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fh = self.path.open("rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.plies, self.depth = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.hits = self.misses = 0
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close(); self._mm = None
+            self._fh.close()
+
+    # Al pasar el libro a otro proceso sólo viaja la ruta; el receptor vuelve a hacer mmap.
+    def __getstate__(self): return {"path": str(self.path)}
+    def __setstate__(self, state): self.__init__(state["path"])
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+    def __len__(self): return self.count
+
+    def lookup_key(self, key:int):
+        """(casilla o None, profundidad, score) para la clave, o None si no está."""
+        mm, lo, hi = self._mm, 0, self.count
+        base, size = HEADER.size, ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            k = struct.unpack_from("<Q", mm, base + mid*size)[0]
+            if k < key: lo = mid + 1
+            elif k > key: hi = mid
+            else:
+                _, sq, depth, score = ENTRY.unpack_from(mm, base + mid*size)
+                self.hits += 1
+                return (None if sq == NO_MOVE else sq, depth, score)
+        self.misses += 1
+        return None
+
+    def probe(self, board:Board, player:int):
+        """Entrada del libro para la posición: dict move/score/depth/pv, o None."""
+        entry = self.lookup_key(board.key(player))
+        if entry is None: return None
+        sq, depth, score = entry
+        move = coords_to_move(*divmod(sq, 8)) if sq is not None else None
+        return {"move": move, "score": score, "depth": depth,
+                "pv": self._book_line(board, player)}
+
+    def _book_line(self, board:Board, player:int, max_len:int=60):
+        """Sigue las jugadas del libro mientras haya entradas."""
+        b, p, line = board.copy(), player, []
+        while len(line) < max_len:
+            e = self.lookup_key(b.key(p))
+            if e is None or e[0] is None: break
+            r, c = divmod(e[0], 8)
+            if not b.apply_move_coords(r, c, p): break
+            line.append(coords_to_move(r, c))
+            p = -p
+            if not b.has_any_move(p): p = -p
+        return line
+
+    def stats(self):
+        return {"path": str(self.path), "entries": self.count, "plies": self.plies,
+                "depth": self.depth, "hits": self.hits, "misses": self.misses}
+
+# --- Construcción ---
+def opening_positions(plies:int):
+    """Todas las posiciones (board, jugador) alcanzables en `plies` jugadas, sin repetir."""
+    seen = {}
+    frontier = [(Board(), BLACK)]
+    for ply in range(plies + 1):
+        nxt = []
+        for b, p in frontier:
+            key = b.key(p)
+            if key in seen: continue
+            seen[key] = (b, p)
+            if ply == plies: continue
+            moves = b.legal_moves_coords(p)
+            if not moves:
+                if b.has_any_move(-p): nxt.append((b, -p))
+                continue
+            for r, c in moves:
+                nb = b.copy(); nb.apply_move_coords(r, c, p)
+                nxt.append((nb, -p))
+        frontier = nxt
+    return list(seen.values())
+
+def game_positions(games, plies:int):
+    """Posiciones de partidas reales (listas de jugadas) hasta `plies`."""
+    seen = {}
+    for moves in games:
+        b, p = Board(), BLACK
+        for mv in moves[:plies]:
+            if not mv or mv.lower() == "pass":
+                if not b.has_any_move(p): p = -p
+                continue
+            if not b.has_any_move(p): p = -p  # pase implícito
+            seen.setdefault(b.key(p), (b.copy(), p))
+            if move_to_coords(mv) is None or not b.apply_move(mv, p): break
+            p = -p
+    return list(seen.values())
+
+def build_book(out, plies:int=6, depth:int=4, games=None, progress:bool=False):
+    """Busca cada posición a `depth` y escribe el libro ordenado. Devuelve número de entradas."""
+    positions = opening_positions(plies) if games is None else game_positions(games, plies)
+    entries = {}
+    t0 = time.perf_counter()
+    for i, (b, p) in enumerate(positions):
+        res = search(b, p, depth)
+        sq = NO_MOVE
+        if res["move"]:
+            r, c = move_to_coords(res["move"]); sq = r*8 + c
+        score = max(-32768, min(32767, int(res["score"])))
+        entries[b.key(p)] = (sq, depth, score)
+        if progress and i % 500 == 0:
+            print(f"{i}/{len(positions)} posiciones, {time.perf_counter()-t0:.1f}s")
+    write_book(out, entries, plies, depth)
+    return len(entries)
+
+def write_book(out, entries:dict, plies:int, depth:int):
+    """`entries`: clave -> (casilla, profundidad, score)."""
+    with Path(out).open("wb") as fh:
+        fh.write(HEADER.pack(MAGIC, len(entries), plies, depth))
+        for key in sorted(entries):
+            sq, d, score = entries[key]
+            fh.write(ENTRY.pack(key, sq, d, score))
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd")
+    p = sub.add_parser("build")
+    p.add_argument("--out", required=True)
+    p.add_argument("--plies", type=int, default=6)
+    p.add_argument("--depth", type=int, default=4)
+    p.add_argument("--games", nargs="*", help="JSON de partidas ({'moves': [...]}) a importar")
+    p = sub.add_parser("probe")
+    p.add_argument("--book", required=True)
+    p.add_argument("moves", nargs="*")
+    args = parser.parse_args()
+    if args.cmd == "build":
+        games = None
+        if args.games:
+            games = [json.loads(Path(f).read_text(encoding="utf-8")).get("moves", []) for f in args.games]
+        n = build_book(args.out, args.plies, args.depth, games, progress=True)
+        print(f"Libro guardado en {args.out}: {n} posiciones")
+    elif args.cmd == "probe":
+        b, player = Board(), BLACK
+        for mv in args.moves:
+            b.apply_move(mv, player); player = -player
+        with OpeningBook(args.book) as book:
+            print(book.probe(b, player))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Caché de resultados de análisis por posición, compartida entre partidas.
+
+A diferencia de la tabla de transposición (cotas de negamax, se pisan entre búsquedas), guarda
+resultados completos de `search` y scores de jugadas ya analizadas con una clave que incluye la
+posición (hash Zobrist y turno), el presupuesto de la búsqueda y ENGINE_VERSION (ver
+othello_engine.analyze_game). Dos partidas con la misma apertura no repiten el trabajo.
+
+Expulsión LRU por tamaño aproximado en bytes (JSON de clave y valor). Con `path` se carga al
+crear y `save()` la escribe en JSON lines, de la entrada menos a la más reciente.
+"""
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from othello_engine import ENGINE_VERSION
+
+DEFAULT_CACHE_BYTES = 64 << 20
+
+class ResultCache:
+    """LRU acotada por bytes y segura entre hilos (el servidor analiza en varios a la vez)."""
+    def __init__(self, max_bytes:int=DEFAULT_CACHE_BYTES, path=None):
+        self.max_bytes = max_bytes
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self.clear()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def clear(self):
+        with self._lock:
+            self._data = OrderedDict()  # clave -> (valor, bytes)
+            self.bytes = 0
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+    def __len__(self): return len(self._data)
+
+    @staticmethod
+    def _size(key, value):
+        return len(json.dumps([key, value], separators=(",", ":")))
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        size = self._size(key, value)
+        if size > self.max_bytes: return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None: self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            self.stores += 1
+            while self.bytes > self.max_bytes:
+                _, (_, s) = self._data.popitem(last=False)
+                self.bytes -= s
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+                "stores": self.stores, "evictions": self.evictions,
+                "path": str(self.path) if self.path else None}
+
+    # --- Persistencia ---
+    def save(self, path=None):
+        """Escribe la caché (reemplazo atómico). Devuelve el número de entradas."""
+        path = Path(path or self.path)
+        tmp = path.with_name(path.name + ".tmp")
+        with self._lock:
+            items = [(k, v) for k, (v, _) in self._data.items()]
+        with tmp.open("w", encoding="utf-8") as fh:
+            for k, v in items:
+                fh.write(json.dumps([k, v], separators=(",", ":")) + "\n")
+        tmp.replace(path)
+        return len(items)
+
+    def load(self, path=None):
+        """Añade las entradas de un archivo de save(); descarta las de otra ENGINE_VERSION."""
+        n = 0
+        with Path(path or self.path).open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip(): continue
+                key, value = json.loads(line)
+                key = tuple(key)
+                if key[-1] != ENGINE_VERSION: continue
+                self.put(key, value)
+                n += 1
+        self.stores -= n  # cargar no cuenta como guardar
+        return n
@@ -1,4 +1,5 @@
-import copy, random
+import atexit, copy, importlib, itertools, multiprocessing, os, random, threading, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from typing import List, Tuple, Optional
 
 # Constantes
@@ -19,56 +20,213 @@ def move_to_coords(move: str):
 def coords_to_move(r: int, c: int):
     return f"{chr(ord('a')+c)}{r+1}"
 
+# --- Bitboards ---
+# Casilla (r,c) -> bit r*8+c. Un entero de 64 bits por color.
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE  # sin columna 'a'
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F  # sin columna 'h'
+INNER_COLS = NOT_A_FILE & NOT_H_FILE
+CORNERS_MASK = (1<<0)|(1<<7)|(1<<56)|(1<<63)
+
+def moves_mask(own:int, opp:int):
+    """Máscara de jugadas legales para `own` (generación por desplazamientos)."""
+    inner = opp & INNER_COLS
+    moves = 0
+    for d, m in ((1,inner),(7,inner),(8,opp),(9,inner)):
+        t = m & (own << d)
+        t |= m & (t << d); t |= m & (t << d); t |= m & (t << d)
+        t |= m & (t << d); t |= m & (t << d)
+        moves |= t << d
+        t = m & (own >> d)
+        t |= m & (t >> d); t |= m & (t >> d); t |= m & (t >> d)
+        t |= m & (t >> d); t |= m & (t >> d)
+        moves |= t >> d
+    return moves & ~(own|opp) & FULL_MASK
+
+# --- Rayos precalculados ---
+def _ray(sq:int, dr:int, dc:int):
+    r, c = divmod(sq, 8)
+    r += dr; c += dc
+    out = []
+    while 0<=r<8 and 0<=c<8:
+        out.append(r*8+c)
+        r += dr; c += dc
+    return tuple(out)
+
+# Para cada casilla, los rayos en cada dirección (índices en orden, cortados en el borde).
+# Se omiten los rayos de menos de 2 casillas: no pueden encerrar discos.
+SQUARE_RAYS = [tuple(ray for ray in (_ray(sq,dr,dc) for dr,dc in DIRECTIONS) if len(ray)>=2)
+               for sq in range(64)]
+SQUARE_RAY_BITS = [tuple(tuple(1<<i for i in ray) for ray in rays) for rays in SQUARE_RAYS]
+
+def flips_mask(own:int, opp:int, sq:int):
+    """Discos que voltea jugar en `sq` (0 si la jugada no es legal)."""
+    flips = 0
+    for ray in SQUARE_RAY_BITS[sq]:
+        f = 0
+        for bit in ray:
+            if opp & bit: f |= bit
+            else:
+                if own & bit: flips |= f
+                break
+    return flips
+
+def is_legal_square(own:int, opp:int, sq:int):
+    """True si jugar en `sq` voltea algo; sale en el primer rayo válido."""
+    for ray in SQUARE_RAY_BITS[sq]:
+        if not opp & ray[0]: continue
+        for bit in ray[1:]:
+            if opp & bit: continue
+            if own & bit: return True
+            break
+    return False
+
+def iter_bits(mask:int):
+    """Índices de los bits activos en orden ascendente (orden fila-columna)."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+# --- Zobrist ---
+# Semilla fija: el mismo hash en todos los procesos y ejecuciones.
+_zrng = random.Random(0x07E110)
+ZOBRIST_BLACK = [_zrng.getrandbits(64) for _ in range(64)]
+ZOBRIST_WHITE = [_zrng.getrandbits(64) for _ in range(64)]
+ZOBRIST_FLIP = [ZOBRIST_BLACK[i]^ZOBRIST_WHITE[i] for i in range(64)]
+ZOBRIST_SIDE = _zrng.getrandbits(64)  # se aplica cuando mueve WHITE
+del _zrng
+
+def zobrist_hash(black:int, white:int):
+    h = 0
+    for sq in iter_bits(black): h ^= ZOBRIST_BLACK[sq]
+    for sq in iter_bits(white): h ^= ZOBRIST_WHITE[sq]
+    return h
+
 # --- Tablero ---
 class Board:
     def __init__(self):
-        self.b = [[EMPTY]*8 for _ in range(8)]
-        self.b[3][3] = WHITE
-        self.b[3][4] = BLACK
-        self.b[4][3] = BLACK
-        self.b[4][4] = WHITE
+        self.black = (1<<28)|(1<<35)
+        self.white = (1<<27)|(1<<36)
+        self.hash = zobrist_hash(self.black, self.white)
+        self._undo = []  # pila de (jugador, bit jugado, volteos, hash previo) para undo_move
+        self._mcache = [None, None, None, None]  # [black, white, jugadas BLACK, jugadas WHITE]
 
-    def copy(self):
-        nb = Board()
-        nb.b = [row[:] for row in self.b]
+    @classmethod
+    def from_bitboards(cls, black:int, white:int):
+        nb = cls.__new__(cls)
+        nb.black = black; nb.white = white
+        nb.hash = zobrist_hash(black, white)
+        nb._undo = []
+        nb._mcache = [None, None, None, None]
         return nb
 
-    def inside(self,r,c): return 0<=r<8 and 0<=c<8
+    @classmethod
+    def from_matrix(cls, matrix):
+        nb = cls.from_bitboards(0, 0)
+        nb.b = matrix
+        return nb
 
-    def _flips_in_dir(self,r,c,player,dr,dc):
-        flips=[]
-        r+=dr;c+=dc
-        while self.inside(r,c) and self.b[r][c]==-player:
-            flips.append((r,c))
-            r+=dr;c+=dc
-        if self.inside(r,c) and self.b[r][c]==player and flips:
-            return flips
-        return []
+    def copy(self):
+        return Board.from_bitboards(self.black, self.white)
 
-    def legal_moves_coords(self, player:int):
-        moves=[]
+    # Vista matricial (compatibilidad con el tablero de listas)
+    @property
+    def b(self):
+        return self.to_matrix()
+
+    @b.setter
+    def b(self, matrix):
+        black = white = 0
         for r in range(8):
             for c in range(8):
-                if self.b[r][c]!=EMPTY: continue
-                total_flips=[]
-                for dr,dc in DIRECTIONS:
-                    f=self._flips_in_dir(r,c,player,dr,dc)
-                    if f: total_flips.extend(f)
-                if total_flips: moves.append((r,c))
-        return moves
+                v = matrix[r][c]
+                if v == BLACK: black |= 1 << (r*8+c)
+                elif v == WHITE: white |= 1 << (r*8+c)
+        self.black = black; self.white = white
+        self.hash = zobrist_hash(black, white)
+
+    def to_matrix(self):
+        black, white = self.black, self.white
+        return [[BLACK if black>>(r*8+c)&1 else WHITE if white>>(r*8+c)&1 else EMPTY
+                 for c in range(8)] for r in range(8)]
+
+    def inside(self,r,c): return 0<=r<8 and 0<=c<8
+
+    def _own_opp(self, player:int):
+        return (self.black, self.white) if player==BLACK else (self.white, self.black)
+
+    def key(self, player:int):
+        """Hash Zobrist de la posición con `player` al turno."""
+        return self.hash if player==BLACK else self.hash ^ ZOBRIST_SIDE
+
+    def legal_moves_mask(self, player:int):
+        """Máscara de jugadas legales. Se guarda por posición para ambos colores, así un nodo
+        (terminal, generación de jugadas y evaluación) genera a lo sumo una vez por color."""
+        black, white = self.black, self.white
+        cache = self._mcache
+        if cache[0] != black or cache[1] != white:
+            cache = self._mcache = [black, white, None, None]
+        if player==BLACK:
+            m = cache[2]
+            if m is None: m = cache[2] = moves_mask(black, white)
+        else:
+            m = cache[3]
+            if m is None: m = cache[3] = moves_mask(white, black)
+        return m
+
+    def legal_moves_coords(self, player:int):
+        return [divmod(sq, 8) for sq in iter_bits(self.legal_moves_mask(player))]
+
+    def is_legal(self, r:int, c:int, player:int):
+        if not self.inside(r,c): return False
+        sq = r*8+c
+        if (self.black|self.white) >> sq & 1: return False
+        own, opp = self._own_opp(player)
+        return is_legal_square(own, opp, sq)
 
     def legal_moves(self, player:int):
         return [coords_to_move(r,c) for (r,c) in self.legal_moves_coords(player)]
 
+    def _play(self, sq:int, player:int):
+        """Coloca en `sq` (vacía) y voltea; actualiza el hash. Devuelve la máscara volteada."""
+        bit = 1 << sq
+        own, opp = self._own_opp(player)
+        flips = flips_mask(own, opp, sq)
+        if not flips: return 0
+        h = self.hash
+        if player==BLACK:
+            self.black = own | bit | flips; self.white = opp ^ flips
+            h ^= ZOBRIST_BLACK[sq]
+        else:
+            self.white = own | bit | flips; self.black = opp ^ flips
+            h ^= ZOBRIST_WHITE[sq]
+        for f in iter_bits(flips): h ^= ZOBRIST_FLIP[f]
+        self.hash = h
+        return flips
+
     def apply_move_coords(self,r:int,c:int,player:int):
-        flips_total=[]
-        for dr,dc in DIRECTIONS:
-            flips=self._flips_in_dir(r,c,player,dr,dc)
-            if flips: flips_total.extend(flips)
-        if not flips_total: return False
-        self.b[r][c]=player
-        for (fr,fc) in flips_total: self.b[fr][fc]=player
-        return True
+        if not self.inside(r,c): return False
+        sq = r*8+c
+        if (self.black|self.white) >> sq & 1: return False
+        return self._play(sq, player) != 0
+
+    # --- make/unmake para la búsqueda (sin copiar el tablero) ---
+    def make_move(self, r:int, c:int, player:int):
+        """Juega en (r,c) apilando los volteos; devuelve la máscara volteada (0 si es ilegal)."""
+        sq = r*8+c
+        if (self.black|self.white) >> sq & 1: return 0
+        prev_hash = self.hash
+        flips = self._play(sq, player)
+        if flips: self._undo.append((player, 1 << sq, flips, prev_hash))
+        return flips
+
+    def undo_move(self):
+        player, bit, flips, self.hash = self._undo.pop()
+        if player==BLACK:
+            self.black ^= bit | flips; self.white |= flips
+        else:
+            self.white ^= bit | flips; self.black |= flips
 
     def apply_move(self, move:str, player:int):
         if not move or move.lower()=="pass": return True
@@ -78,80 +236,913 @@ class Board:
         return self.apply_move_coords(r,c,player)
 
     def has_any_move(self,player:int):
-        return len(self.legal_moves_coords(player))>0
+        return self.legal_moves_mask(player)!=0
 
     def is_terminal(self):
         return not (self.has_any_move(BLACK) or self.has_any_move(WHITE))
 
     def counts(self):
-        b=sum(1 for r in range(8) for c in range(8) if self.b[r][c]==BLACK)
-        w=sum(1 for r in range(8) for c in range(8) if self.b[r][c]==WHITE)
-        return {"black":b,"white":w}
+        return {"black":self.black.bit_count(),"white":self.white.bit_count()}
 
     def evaluate(self):
-        cnt=self.counts()
-        disc_diff=cnt["black"]-cnt["white"]
-        corners=[(0,0),(0,7),(7,0),(7,7)]
-        corner_score=0
-        for r,c in corners:
-            v=self.b[r][c]
-            if v==BLACK: corner_score+=25
-            elif v==WHITE: corner_score-=25
-        mobility=len(self.legal_moves_coords(BLACK))-len(self.legal_moves_coords(WHITE))
+        black, white = self.black, self.white
+        disc_diff=black.bit_count()-white.bit_count()
+        corner_score=25*((black&CORNERS_MASK).bit_count()-(white&CORNERS_MASK).bit_count())
+        mobility=self.legal_moves_mask(BLACK).bit_count()-self.legal_moves_mask(WHITE).bit_count()
         return disc_diff + 10*mobility + corner_score
 
+# --- Backends de tablero ---
+# negamax, search, analyze_game y el solver sólo usan esta interfaz, así que cualquier clase que
+# la cumpla sirve de backend (ver othello_listboard.ListBoard, la implementación de referencia):
+BOARD_INTERFACE = (
+    "copy", "from_bitboards", "from_matrix", "to_matrix", "b", "black", "white", "_own_opp",
+    "key", "legal_moves_mask", "legal_moves_coords", "legal_moves", "is_legal", "has_any_move",
+    "is_terminal", "apply_move_coords", "apply_move", "make_move", "undo_move", "counts",
+    "evaluate")
+# nombre -> "módulo:clase"; se importa al pedirlo (el backend de referencia importa este módulo)
+BACKENDS = {"bitboard": "othello_engine:Board", "list": "othello_listboard:ListBoard"}
+DEFAULT_BACKEND = os.getenv("OTHELLO_BACKEND", "bitboard")
+
+def get_backend(name:str=None):
+    """Clase de tablero del backend `name` (por defecto DEFAULT_BACKEND)."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be one of {tuple(BACKENDS)}")
+    module, cls = BACKENDS[name].split(":")
+    return getattr(importlib.import_module(module), cls)
+
+def new_board(backend:str=None):
+    """Tablero inicial con el backend elegido."""
+    return get_backend(backend)()
+
+def perft(board, player:int, depth:int):
+    """Hojas a `depth` plies: pasar cuenta como ply y un final de partida es una hoja."""
+    if depth == 0: return 1
+    moves = board.legal_moves_coords(player)
+    if not moves:
+        if not board.has_any_move(-player): return 1
+        return perft(board, -player, depth-1)
+    if depth == 1: return len(moves)
+    n = 0
+    for r, c in moves:
+        board.make_move(r, c, player)
+        n += perft(board, -player, depth-1)
+        board.undo_move()
+    return n
+
+# --- Tabla de transposición ---
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+DEFAULT_TT_SIZE = 1 << 18
+
+class TranspositionTable:
+    """Tabla acotada indexada por hash Zobrist.
+
+    Cada entrada es (key, depth, flag, score, best_move, generation). Políticas de
+    reemplazo: "depth" conserva la entrada más profunda salvo que sea de una búsqueda
+    anterior (generación vieja); "always" reemplaza siempre.
+    """
+    POLICIES = ("depth", "always")
+
+    def __init__(self, size:int=DEFAULT_TT_SIZE, policy:str="depth"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+        size = 1 << max(1, int(size)-1).bit_length()  # potencia de 2
+        self.size = size
+        self.policy = policy
+        self._mask = size - 1
+        self.clear()
+
+    def clear(self):
+        self.table = [None]*self.size
+        self.generation = 0
+        self.hits = self.misses = self.stores = self.overwrites = 0
+
+    def new_search(self):
+        """Marca el inicio de una búsqueda; las entradas previas pasan a ser reemplazables."""
+        self.generation += 1
+
+    def probe(self, key:int):
+        e = self.table[key & self._mask]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        self.misses += 1
+        return None
+
+    def store(self, key:int, depth:int, flag:int, score, best_move):
+        i = key & self._mask
+        old = self.table[i]
+        if old is not None and self.policy == "depth" and old[0] != key \
+                and old[1] > depth and old[5] == self.generation:
+            return
+        if old is not None and old[0] != key:
+            self.overwrites += 1
+        self.table[i] = (key, depth, flag, score, best_move, self.generation)
+        self.stores += 1
+
+    def stats(self):
+        used = sum(1 for e in self.table if e is not None)
+        probes = self.hits + self.misses
+        return {"size": self.size, "policy": self.policy, "used": used,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits/probes if probes else 0.0,
+                "stores": self.stores, "overwrites": self.overwrites}
+
+# --- Presupuesto de búsqueda ---
+MAX_SEARCH_DEPTH = 60
+CHECK_EVERY = 255  # nodos entre consultas al reloj (máscara)
+ASPIRATION_WINDOW = 20  # semiancho sugerido de la ventana de aspiración (escala de evaluate)
+
+CANCEL_POLL_S = 0.05  # espera máxima entre consultas de cancelación fuera de negamax
+
+class SearchAborted(Exception):
+    """Se agotó el presupuesto de tiempo o de nodos."""
+
+class SearchCancelled(Exception):
+    """Se canceló la búsqueda (CancelToken). A diferencia de SearchAborted no deja resultado
+    parcial: llega hasta quien llamó a search/analyze_game."""
+
+class CancelToken:
+    """Cancelación cooperativa: la búsqueda consulta `cancelled` cada CHECK_EVERY+1 nodos.
+    `deadline_ms` cancela sola pasado ese tiempo desde su creación."""
+    def __init__(self, deadline_ms:float=None):
+        self._event = threading.Event()
+        self.deadline = time.perf_counter() + deadline_ms/1000.0 if deadline_ms else None
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set(): return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self._event.set()
+            return True
+        return False
+
+# --- Ordenación de jugadas ---
+# Prioridad estática por casilla: esquinas primero, casillas X/C (junto a esquinas) al final.
+_WEIGHTS_QUADRANT = [[100,-20,10, 5],
+                     [-20,-50,-2,-2],
+                     [ 10, -2, 1, 1],
+                     [  5, -2, 1, 0]]
+SQUARE_WEIGHTS = [_WEIGHTS_QUADRANT[min(r,7-r)][min(c,7-c)] for r in range(8) for c in range(8)]
+KILLER_SLOTS = 2
+MOBILITY_ORDER_PLIES = 1  # plies cerca de la raíz ordenados por movilidad rival
+
+_SEARCH_IDS = itertools.count(1)  # SearchContext.search_id (ver _root_child_job)
+
+class SearchContext:
+    """Estado compartido por los nodos de una búsqueda: contador de nodos, límites y
+    heurísticas de ordenación (PV de la iteración anterior, killers por ply, historia).
+    `pvs` activa la búsqueda de ventana nula (NegaScout) en negamax y `cancel` (CancelToken o
+    cualquier objeto con `cancelled`) permite cancelarla desde otro hilo."""
+    def __init__(self, time_ms:float=None, max_nodes:int=None, ordering:bool=True, pvs:bool=False,
+                 cancel=None):
+        self.start = time.perf_counter()
+        self.deadline = self.start + time_ms/1000.0 if time_ms else None
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.evals = self.cutoffs = self.tt_hits = 0  # estadísticas (ver stats)
+        self.enforce = True  # False mientras se busca la iteración mínima
+        self.ordering = ordering
+        self.pvs = pvs
+        self.cancel = cancel
+        self.pv = []  # jugadas (r,c) de la PV de la iteración anterior, por ply
+        self.killers = [[] for _ in range(MAX_SEARCH_DEPTH+1)]
+        self.history = {BLACK: [0]*64, WHITE: [0]*64}
+        self.search_id = next(_SEARCH_IDS)
+        self.root_pvs = {}  # jugada de la raíz -> su PV en la iteración anterior (_parallel_root)
+
+    def tick(self):
+        self.nodes += 1
+        if self.cancel is not None and not self.nodes & CHECK_EVERY and self.cancel.cancelled:
+            raise SearchCancelled()
+        if not self.enforce: return
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchAborted()
+        if self.deadline is not None and not self.nodes & CHECK_EVERY \
+                and time.perf_counter() >= self.deadline:
+            raise SearchAborted()
+
+    def check_cancel(self):
+        if self.cancel is not None and self.cancel.cancelled: raise SearchCancelled()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000.0
+
+    def counters(self):
+        return (self.nodes, self.evals, self.cutoffs, self.tt_hits)
+
+    def add_counters(self, counters):
+        nodes, evals, cutoffs, tt_hits = counters
+        self.nodes += nodes; self.evals += evals; self.cutoffs += cutoffs; self.tt_hits += tt_hits
+
+    def stats(self, depth:int=0):
+        """Bloque `stats`: nodos, evaluaciones de hoja, cortes beta, aciertos de TT, tiempo, nodos/s."""
+        elapsed = self.elapsed_ms()
+        return {"nodes": self.nodes, "leaf_evals": self.evals, "cutoffs": self.cutoffs,
+                "tt_hits": self.tt_hits, "depth": depth, "elapsed_ms": round(elapsed, 3),
+                "nps": round(self.nodes * 1000.0 / elapsed) if elapsed > 0 else 0}
+
+    def order_moves(self, board:Board, moves:list, player:int, ply:int, depth:int, tt_move=None):
+        """Jugada de TT, jugada PV, killers y luego historia + prioridad estática.
+        Cerca de la raíz se prefiere además dejar al rival con pocas jugadas."""
+        if len(moves) < 2: return moves
+        pv_move = self.pv[ply] if ply < len(self.pv) else None
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        hist = self.history[player]
+        by_mobility = ply < MOBILITY_ORDER_PLIES and depth >= 3
+        scored = []
+        for m in moves:
+            if m == tt_move: score = 1 << 40
+            elif m == pv_move: score = 1 << 39
+            else:
+                sq = m[0]*8 + m[1]
+                score = hist[sq] + SQUARE_WEIGHTS[sq]
+                if m in killers: score += 1 << 30
+                if by_mobility:
+                    board.make_move(m[0], m[1], player)
+                    score -= board.legal_moves_mask(-player).bit_count() << 20
+                    board.undo_move()
+            scored.append((score, m))
+        scored.sort(key=lambda t: t[0], reverse=True)
+        return [m for _, m in scored]
+
+    def record_cutoff(self, move, player:int, ply:int, depth:int):
+        if ply < len(self.killers):
+            k = self.killers[ply]
+            if move not in k:
+                k.insert(0, move); del k[KILLER_SLOTS:]
+        self.history[player][move[0]*8 + move[1]] += depth*depth
+
 # --- Negamax con poda alfa-beta ---
-def negamax(board:Board, depth:int, player:int, alpha:float, beta:float):
-    if depth==0 or board.is_terminal():
+def negamax(board:Board, depth:int, player:int, alpha:float, beta:float,
+            tt:TranspositionTable=None, ctx:SearchContext=None, ply:int=0):
+    if ctx is not None: ctx.tick()
+    if depth==0:
+        if ctx is not None: ctx.evals+=1
         return (player*board.evaluate(), None, [])
-    moves=board.legal_moves_coords(player)
-    if not moves:
-        if board.has_any_move(-player):
-            val,mv,pv=negamax(board,depth,-player,-beta,-alpha)
-            return (-val,None,pv)
-        else:
-            return (player*board.evaluate(), None, [])
+    moves_bits=board.legal_moves_mask(player)
+    if not moves_bits and not board.legal_moves_mask(-player):
+        if ctx is not None: ctx.evals+=1
+        return (player*board.evaluate(), None, [])  # fin de partida
+    tt_move=None
+    if tt is not None:
+        key=board.key(player)
+        entry=tt.probe(key)
+        if entry is not None:
+            _,e_depth,flag,score,tt_move,_=entry
+            if ctx is not None: ctx.tt_hits+=1
+            if e_depth>=depth:
+                pv=[coords_to_move(*tt_move)] if tt_move else []
+                if flag==TT_EXACT: return (score, tt_move, pv)
+                if flag==TT_LOWER: alpha=max(alpha,score)
+                else: beta=min(beta,score)
+                if alpha>=beta: return (score, tt_move, pv)
+        alpha_orig=alpha
+    if not moves_bits:  # pasa: el rival sí tiene jugadas
+        val,mv,pv=negamax(board,depth,-player,-beta,-alpha,tt,ctx,ply+1)
+        return (-val,None,pv)
+    moves=[divmod(sq,8) for sq in iter_bits(moves_bits)]
+    if ctx is not None and ctx.ordering:
+        moves=ctx.order_moves(board,moves,player,ply,depth,tt_move)
+    elif tt_move is not None and tt_move in moves:
+        moves.remove(tt_move); moves.insert(0,tt_move)
     best_val=-1e9; best_move=None; best_pv=[]
+    pvs=ctx is not None and ctx.pvs
     for r,c in moves:
-        nb=board.copy(); nb.apply_move_coords(r,c,player)
-        val_child,_,pv_child=negamax(nb,depth-1,-player,-beta,-alpha)
+        board.make_move(r,c,player)
+        if pvs and best_move is not None:
+            # PVS: ventana nula para demostrar que no mejora; si lo hace, se rebusca
+            val_child,_,pv_child=negamax(board,depth-1,-player,-alpha-1,-alpha,tt,ctx,ply+1)
+            if alpha<-val_child<beta:
+                val_child,_,pv_child=negamax(board,depth-1,-player,-beta,-alpha,tt,ctx,ply+1)
+        else:
+            val_child,_,pv_child=negamax(board,depth-1,-player,-beta,-alpha,tt,ctx,ply+1)
+        board.undo_move()
         val=-val_child
         if val>best_val:
             best_val=val; best_move=(r,c); best_pv=[coords_to_move(r,c)]+pv_child
         alpha=max(alpha,val)
-        if alpha>=beta: break
+        if alpha>=beta:
+            if ctx is not None:
+                ctx.cutoffs+=1
+                if ctx.ordering: ctx.record_cutoff((r,c),player,ply,depth)
+            break
+    if tt is not None:
+        flag=TT_UPPER if best_val<=alpha_orig else TT_LOWER if best_val>=beta else TT_EXACT
+        tt.store(key,depth,flag,best_val,best_move)
     return (best_val, best_move, best_pv)
 
-def find_best_move(board:Board, player:int, max_depth:int=4):
-    val, best_coords, pv = negamax(board,max_depth,player,-1e9,1e9)
-    if best_coords is None: return (None,pv,val)
-    r,c=best_coords
-    return (coords_to_move(r,c), pv, val)
+def extend_pv_from_tt(board:Board, player:int, pv:list, tt:TranspositionTable, max_len:int):
+    """Completa una PV truncada por cortes de TT siguiendo las mejores jugadas guardadas."""
+    b=board.copy(); p=player; pv=list(pv)
+    for mv in pv:
+        if not b.has_any_move(p): p=-p
+        r,c=move_to_coords(mv)
+        if not b.make_move(r,c,p): return pv
+        p=-p
+    while len(pv)<max_len:
+        if not b.has_any_move(p):
+            if not b.has_any_move(-p): break
+            p=-p
+        e=tt.table[b.key(p) & tt._mask]
+        if e is None or e[0]!=b.key(p) or e[4] is None: break
+        r,c=e[4]
+        if not b.make_move(r,c,p): break
+        pv.append(coords_to_move(r,c)); p=-p
+    return pv
+
+def multipv_root(board:Board, player:int, depth:int, k:int, tt:TranspositionTable=None,
+                 ctx:SearchContext=None, order:list=None):
+    """Las `k` mejores jugadas de la raíz en una sola pasada: [(score, (r,c), pv)], de mejor a peor.
+
+    Cada jugada se busca con alfa = score de la k-ésima encontrada hasta ahora; si no lo
+    supera sólo se sabe que es peor y queda fuera, así que las k devueltas tienen score
+    exacto y el resto se poda como en una búsqueda normal. `order`: jugadas (r,c) a probar
+    primero (las de la iteración anterior)."""
+    moves=[divmod(sq,8) for sq in iter_bits(board.legal_moves_mask(player))]
+    if ctx is not None and ctx.ordering:
+        moves=ctx.order_moves(board,moves,player,0,depth)
+    if order:
+        rank={m:i for i,m in enumerate(order)}
+        moves.sort(key=lambda m: rank.get(m,len(rank)))
+    lines=[]
+    for r,c in moves:
+        alpha=lines[k-1][0] if len(lines)>=k else -1e9
+        board.make_move(r,c,player)
+        val,_,pv=negamax(board,depth-1,-player,-1e9,-alpha,tt,ctx,1)
+        board.undo_move()
+        if len(lines)<k or -val>alpha:
+            lines.append((-val,(r,c),[coords_to_move(r,c)]+pv))
+            lines.sort(key=lambda t: -t[0]); del lines[k:]
+    return lines
+
+# --- Final exacto ---
+DEFAULT_ENDGAME_EMPTIES = 10
+FASTEST_FIRST_EMPTIES = 6  # por encima, ordenar por movilidad rival; por debajo, sólo paridad
+ENDGAME_MODES = ("exact", "wld")
+QUADRANT_MASKS = (0x0F0F0F0F, 0xF0F0F0F0, 0x0F0F0F0F << 32, 0xF0F0F0F0 << 32)
+
+def final_score(own:int, opp:int):
+    """Diferencia final de discos para `own`; las casillas vacías son del ganador."""
+    o, p = own.bit_count(), opp.bit_count()
+    if o > p: return 64 - 2*p
+    if o < p: return 2*o - 64
+    return 0
+
+def _odd_quadrants(empty:int):
+    odd = 0
+    for q in QUADRANT_MASKS:
+        if (empty & q).bit_count() & 1: odd |= q
+    return odd
+
+def _solve_last1(own:int, opp:int, sq:int):
+    f = flips_mask(own, opp, sq)
+    if f: return 2*((own | f).bit_count() + 1) - 64
+    f = flips_mask(opp, own, sq)
+    if f: return 64 - 2*((opp | f).bit_count() + 1)
+    return final_score(own, opp)
+
+def _solve(own:int, opp:int, alpha:int, beta:int, ctx:"SearchContext"=None, passed:bool=False):
+    """Negamax exacto sobre bitboards; devuelve la diferencia final (fail-soft)."""
+    if ctx is not None: ctx.tick()
+    empty = ~(own | opp) & FULL_MASK
+    n = empty.bit_count()
+    if n == 1:
+        return _solve_last1(own, opp, empty.bit_length() - 1)
+    if n <= 3:
+        # pocos huecos: probar cada casilla vacía sin generar la máscara de jugadas
+        odd = _odd_quadrants(empty)
+        squares = [sq for sq in iter_bits(empty & odd)] + [sq for sq in iter_bits(empty & ~odd)]
+        best = -65
+        for sq in squares:
+            f = flips_mask(own, opp, sq)
+            if not f: continue
+            v = -_solve(opp ^ f, own | f | (1 << sq), -beta, -alpha, ctx)
+            if v > best:
+                best = v
+                if v > alpha:
+                    alpha = v
+                    if alpha >= beta: return best
+        if best > -65: return best
+    else:
+        moves = moves_mask(own, opp)
+        if moves:
+            children = []
+            odd = _odd_quadrants(empty)
+            for sq in iter_bits(moves):
+                bit = 1 << sq
+                f = flips_mask(own, opp, sq)
+                c_own, c_opp = opp ^ f, own | f | bit  # hijo desde el punto de vista del rival
+                if n > FASTEST_FIRST_EMPTIES:
+                    key = moves_mask(c_own, c_opp).bit_count()*2 + (0 if odd & bit else 1)
+                else:
+                    key = 0 if odd & bit else 1
+                children.append((key, c_own, c_opp))
+            children.sort(key=lambda t: t[0])
+            best = -65
+            for _, c_own, c_opp in children:
+                v = -_solve(c_own, c_opp, -beta, -alpha, ctx)
+                if v > best:
+                    best = v
+                    if v > alpha:
+                        alpha = v
+                        if alpha >= beta: break
+            return best
+    # sin jugadas: pasa o fin de partida
+    if passed: return -final_score(opp, own)
+    return -_solve(opp, own, -beta, -alpha, ctx, True)
+
+def _sign(v): return (v > 0) - (v < 0)
+
+def solve_endgame(board:Board, player:int, mode:str="exact", ctx:"SearchContext"=None,
+                  multipv:int=1):
+    """Resuelve la posición hasta el final.
+
+    mode="exact": diferencia final de discos exacta para `player` (vacías al ganador).
+    mode="wld": sólo gana/empata/pierde; score es 1, 0 o -1 (más rápido, ventana nula).
+    Con `multipv` > 1 añade `multipv`: las mejores jugadas con su score exacto y su PV.
+    Devuelve dict con move, pv, score y solved=True.
+    """
+    if mode not in ENDGAME_MODES:
+        raise ValueError(f"mode must be one of {ENDGAME_MODES}")
+    exact = mode == "exact"
+    own, opp = board._own_opp(player)
+    lo, hi = (-65, 65) if exact else (-1, 1)
+
+    def best_child(own, opp, target=None):
+        """Mejor jugada (sq, valor); con `target` devuelve la primera que lo alcanza."""
+        moves = moves_mask(own, opp)
+        children = []
+        for sq in iter_bits(moves):
+            f = flips_mask(own, opp, sq)
+            c_own, c_opp = opp ^ f, own | f | (1 << sq)
+            children.append((moves_mask(c_own, c_opp).bit_count(), sq, c_own, c_opp))
+        children.sort(key=lambda t: t[0])
+        best_sq, best, alpha = None, -65, lo
+        for _, sq, c_own, c_opp in children:
+            if target is None:
+                v = -_solve(c_own, c_opp, -hi, -alpha, ctx)
+            elif exact:
+                v = -_solve(c_own, c_opp, -(target+1), -(target-1), ctx)
+            else:
+                v = -_solve(c_own, c_opp, -1, 1, ctx)
+            if target is not None:
+                if (v if exact else _sign(v)) == target: return sq, target
+                continue
+            if v > best:
+                best_sq, best = sq, v
+                alpha = max(alpha, v)
+                if alpha >= hi: break
+        return best_sq, best
+
+    def line(p_own, p_opp, target):
+        """PV: en cada ply, la primera jugada que mantiene el resultado."""
+        pv = []
+        while True:
+            if not moves_mask(p_own, p_opp):
+                if not moves_mask(p_opp, p_own): break
+                p_own, p_opp, target = p_opp, p_own, -target  # pase (no se anota en la PV)
+                continue
+            sq, _ = best_child(p_own, p_opp, target)
+            if sq is None: break
+            pv.append(coords_to_move(*divmod(sq, 8)))
+            f = flips_mask(p_own, p_opp, sq)
+            p_own, p_opp, target = p_opp ^ f, p_own | f | (1 << sq), -target
+        return pv
+
+    lines = None
+    if not moves_mask(own, opp):
+        score = _solve(own, opp, lo, hi, ctx)
+        best_sq = None
+    elif multipv > 1:
+        # cada jugada con ventana (k-ésimo score, hi): las que no la superan quedan fuera
+        top = []  # (score, casilla), de mejor a peor
+        for sq in iter_bits(moves_mask(own, opp)):
+            f = flips_mask(own, opp, sq)
+            alpha = top[multipv-1][0] if len(top) >= multipv else lo
+            v = -_solve(opp ^ f, own | f | (1 << sq), -hi, -alpha, ctx)
+            if not exact: v = _sign(v)
+            if len(top) < multipv or v > alpha:
+                top.append((v, sq)); top.sort(key=lambda t: -t[0]); del top[multipv:]
+        best_sq, score = top[0][1], top[0][0]
+        lines = []
+        for v, sq in top:
+            f = flips_mask(own, opp, sq)
+            move = coords_to_move(*divmod(sq, 8))
+            lines.append({"move": move, "score": v,
+                          "pv": [move] + line(opp ^ f, own | f | (1 << sq), -v)})
+    else:
+        best_sq, score = best_child(own, opp)
+    if not exact: score = _sign(score)
+    move = coords_to_move(*divmod(best_sq, 8)) if best_sq is not None else None
+    result = {"move": move, "pv": lines[0]["pv"] if lines else line(own, opp, score),
+              "score": score, "solved": True}
+    if multipv > 1:
+        result["multipv"] = lines or [{"move": None, "score": score, "pv": result["pv"]}]
+    return result
+
+# --- Búsqueda paralela en la raíz ---
+# "Young brothers wait": la primera jugada de la raíz se busca en serie para fijar alfa y el
+# resto se reparte entre procesos persistentes. Cada proceso conserva su propia TT; en modo
+# determinista la vacía al empezar otra búsqueda (qué jugadas le tocan depende del reparto).
+PARALLEL_MIN_DEPTH = 4  # por debajo no compensa repartir
+
+_POOLS = {}        # workers -> (executor, cota compartida, lock, bandera de cancelación)
+_POOLS_LOCK = threading.Lock()
+# sin fork: el servidor crea los pools desde hilos de jobs y un fork copiaría sus locks tomados
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_WORKER = {}       # estado propio de cada proceso trabajador
+
+class _SharedCancel:
+    """Cancelación vista desde un trabajador: la bandera compartida del pool."""
+    @property
+    def cancelled(self): return _WORKER["abort"].value != 0
+
+def _init_worker(shared_alpha, abort, tt_size:int):
+    _WORKER["alpha"] = shared_alpha
+    _WORKER["abort"] = abort
+    _WORKER["tt"] = TranspositionTable(tt_size)
+    _WORKER["search_id"] = None
+
+def get_search_pool(workers:int, tt_size:int=DEFAULT_TT_SIZE):
+    """Pool de `workers` procesos (se crea una vez y se reutiliza entre búsquedas)."""
+    with _POOLS_LOCK:
+        entry = _POOLS.get(workers)
+        if entry is None:
+            ctx = multiprocessing.get_context(POOL_START_METHOD)
+            shared = ctx.Value("d", -1e9, lock=False)
+            abort = ctx.Value("b", 0, lock=False)
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                           initializer=_init_worker, initargs=(shared, abort, tt_size))
+            entry = _POOLS[workers] = (executor, shared, threading.Lock(), abort)
+        return entry
+
+def shutdown_search_pools():
+    with _POOLS_LOCK:
+        for executor, *_ in _POOLS.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+atexit.register(shutdown_search_pools)
+
+def _root_child_job(black:int, white:int, player:int, move, depth:int, alpha:float,
+                    deadline:float, max_nodes:int, shared_bound:bool, pvs:bool=False,
+                    search_id:int=None, ordering:tuple=None):
+    """Busca la jugada `move` de la raíz en un trabajador. Devuelve (valor, pv, contadores) o None
+    si se agotó el presupuesto o se canceló (contadores: SearchContext.counters). `deadline` es
+    time.time() absoluto (comparable entre procesos). Con `search_id` distinto del anterior la
+    TT del trabajador empieza vacía. `ordering` es (pv, killers, historia) de la raíz."""
+    board = Board.from_bitboards(black, white)
+    board.make_move(move[0], move[1], player)
+    if shared_bound: alpha = max(alpha, _WORKER["alpha"].value)
+    time_ms = max(0.0, (deadline - time.time()) * 1000.0) if deadline is not None else None
+    if time_ms == 0.0: return None
+    ctx = SearchContext(time_ms, max_nodes, pvs=pvs, cancel=_SharedCancel())
+    if ordering is not None: ctx.pv, ctx.killers, ctx.history = ordering
+    tt = _WORKER["tt"]
+    if search_id is not None and search_id != _WORKER["search_id"]:
+        tt.clear()
+        _WORKER["search_id"] = search_id
+    tt.new_search()
+    try:
+        val, _, pv = negamax(board, depth-1, -player, -1e9, -alpha, tt, ctx, 1)
+    except (SearchAborted, SearchCancelled):
+        return None
+    return (-val, [coords_to_move(*move)] + pv, ctx.counters())
+
+def _finished(futures, ordered:bool, ctx:SearchContext):
+    """Futuros a medida que terminan (en su orden si `ordered`), consultando la cancelación."""
+    remaining = list(futures)
+    while remaining:
+        done, _ = wait(remaining[:1] if ordered else remaining, CANCEL_POLL_S, FIRST_COMPLETED)
+        ctx.check_cancel()
+        for f in done:
+            remaining.remove(f)
+            yield f
+
+def _acquire(lock, ctx:SearchContext):
+    """Toma el lock del pool; mientras otra búsqueda lo tiene, atiende cancelación y reloj."""
+    while not lock.acquire(timeout=CANCEL_POLL_S):
+        ctx.check_cancel()
+        if ctx.enforce and ctx.deadline is not None and time.perf_counter() >= ctx.deadline:
+            raise SearchAborted()
+
+def _parallel_root(root:Board, player:int, depth:int, tt:TranspositionTable, ctx:SearchContext,
+                   workers:int, deterministic:bool):
+    """Una iteración de la raíz repartida entre procesos; mismo contrato que negamax."""
+    root_moves = root.legal_moves_coords(player)
+    if len(root_moves) < 2 or depth < PARALLEL_MIN_DEPTH:
+        return negamax(root, depth, player, -1e9, 1e9, tt, ctx)
+    e = tt.probe(root.key(player))
+    root_moves = ctx.order_moves(root, root_moves, player, 0, depth, e[4] if e else None)
+    # hermano mayor en serie
+    first = root_moves[0]
+    root.make_move(first[0], first[1], player)
+    val, _, pv = negamax(root, depth-1, -player, -1e9, 1e9, tt, ctx, 1)
+    root.undo_move()
+    best_val, best_move, best_pv = -val, first, [coords_to_move(*first)] + pv
+    executor, shared, lock, abort = get_search_pool(workers, tt.size)
+    deadline = time.time() + (ctx.deadline - time.perf_counter()) if ctx.deadline else None
+    max_nodes = ctx.max_nodes - ctx.nodes if ctx.max_nodes is not None else None
+    # cada trabajador ordena con la PV anterior de su jugada, killers e historia, no desde cero
+    ordering = lambda m: (ctx.root_pvs.get(m, ctx.pv), ctx.killers, ctx.history)
+    _acquire(lock, ctx)  # la cota compartida es de una búsqueda a la vez
+    try:
+        shared.value = best_val
+        abort.value = 0
+        futures = [executor.submit(_root_child_job, root.black, root.white, player, m, depth,
+                                   best_val, deadline, max_nodes, not deterministic, ctx.pvs,
+                                   ctx.search_id if deterministic else None, ordering(m))
+                   for m in root_moves[1:]]
+        index = {f: i for i, f in enumerate(futures)}
+        results = [None]*len(futures)
+        try:
+            # en modo determinista se recorren en el orden de la raíz: mismo resultado siempre
+            for f in _finished(futures, deterministic, ctx):
+                res = f.result()
+                if res is None: raise SearchAborted()
+                results[index[f]] = res
+                ctx.add_counters(res[2])
+                if res[0] > best_val and not deterministic:
+                    shared.value = max(shared.value, res[0])
+        except (SearchAborted, SearchCancelled):
+            abort.value = 1  # los trabajadores en marcha lo ven en su próximo chequeo
+            for f in futures: f.cancel()
+            raise
+    finally:
+        lock.release()
+    for i, (v, pv, _) in enumerate(results):  # desempate por orden de la raíz
+        ctx.root_pvs[root_moves[i+1]] = [move_to_coords(m) for m in pv]
+        if v > best_val:
+            best_val, best_move, best_pv = v, root_moves[i+1], pv
+    tt.store(root.key(player), depth, TT_EXACT, best_val, best_move)
+    return (best_val, best_move, best_pv)
+
+def search(board:Board, player:int, max_depth:int=4, time_ms:float=None, max_nodes:int=None,
+           tt:TranspositionTable=None, ordering:bool=True,
+           endgame_empties:int=DEFAULT_ENDGAME_EMPTIES, endgame_mode:str="exact",
+           workers:int=1, deterministic:bool=True, book=None, pvs:bool=False, aspiration:int=0,
+           cancel:CancelToken=None, multipv:int=1):
+    """Busca la mejor jugada para `player` con profundización iterativa (ver README).
+
+    max_depth, time_ms, max_nodes: límites; con tiempo/nodos vale la última iteración completa.
+    tt: tabla de transposición a compartir. ordering: False busca sin ordenar (benchmarks).
+    endgame_empties, endgame_mode: final exacto ("exact"/"wld") con esas vacías o menos.
+    workers, deterministic: procesos para la raíz y si comparten la mejor cota.
+    book: libro de aperturas. pvs, aspiration: PVS y ventana de aspiración (ASPIRATION_WINDOW).
+    cancel: CancelToken (lanza SearchCancelled). multipv: k mejores jugadas en `multipv`.
+    Devuelve move, pv, score, depth, solved, book, nodes, elapsed_ms, complete y stats.
+    """
+    ctx=SearchContext(time_ms, max_nodes, ordering=ordering, pvs=pvs, cancel=cancel)
+    if book is not None and multipv <= 1:  # el libro sólo guarda una jugada por posición
+        hit = book.probe(board, player)
+        if hit is not None:
+            hit.update(solved=False, book=True, complete=True, nodes=0,
+                       elapsed_ms=round(ctx.elapsed_ms(), 3), stats=ctx.stats(hit["depth"]))
+            return hit
+    if tt is None: tt=TranspositionTable()
+    tt.new_search()
+    root=board.copy()  # una búsqueda abortada deja el tablero a medio deshacer
+    empties = 64 - (root.black|root.white).bit_count()
+    if endgame_empties and empties <= endgame_empties:
+        try:
+            result = solve_endgame(root, player, endgame_mode, ctx, multipv)
+            result.update(depth=empties, complete=True, book=False, nodes=ctx.nodes,
+                          elapsed_ms=round(ctx.elapsed_ms(), 3), stats=ctx.stats(empties))
+            return result
+        except SearchAborted:
+            pass
+    budgeted = time_ms is not None or max_nodes is not None
+    max_depth = max(max_depth, 0)  # profundidad 0: evaluación estática, sin jugada
+    depths = range(1, max_depth+1) if (budgeted or ordering) and max_depth else [max_depth]
+    result = {"move": None, "pv": [], "score": 0, "depth": 0, "complete": True}
+    scores = {}  # profundidad -> score, para las ventanas de aspiración
+    lines = None
+    multi = multipv > 1 and root.legal_moves_mask(player)
+    for depth in depths:
+        ctx.enforce = depth > 1
+        try:
+            if multi:
+                found = multipv_root(root,player,depth,multipv,tt,ctx,
+                                     [m for _,m,_ in lines] if lines else None)
+                val, best_coords, pv = found[0]
+            elif workers > 1:
+                val, best_coords, pv = _parallel_root(root,player,depth,tt,ctx,workers,deterministic)
+            elif aspiration and depth-2 in scores:
+                # centrada en la iteración de igual paridad: la evaluación oscila entre pares e impares
+                lo, hi = scores[depth-2]-aspiration, scores[depth-2]+aspiration
+                while True:
+                    val, best_coords, pv = negamax(root,depth,player,lo,hi,tt,ctx)
+                    if val <= lo: lo = -1e9
+                    elif val >= hi: hi = 1e9
+                    else: break
+            else:
+                val, best_coords, pv = negamax(root,depth,player,-1e9,1e9,tt,ctx)
+        except SearchAborted:
+            result["complete"] = False
+            break
+        pv = extend_pv_from_tt(board, player, pv, tt, depth)
+        ctx.pv = [move_to_coords(m) for m in pv]
+        scores[depth] = val
+        if multi: lines = found
+        result = {"move": coords_to_move(*best_coords) if best_coords else None,
+                  "pv": pv, "score": val, "depth": depth, "complete": depth==max_depth}
+        if depth >= empties: break  # el árbol ya llega al final de la partida
+    result["complete"] = result["complete"] or result["depth"] >= min(max_depth, empties)
+    result["solved"] = False
+    result["book"] = False
+    if multipv > 1:
+        result["multipv"] = [{"move": coords_to_move(*m), "score": v,
+                              "pv": extend_pv_from_tt(board, player, line, tt, result["depth"])}
+                             for v, m, line in lines] if lines else \
+            [{"move": result["move"], "score": result["score"], "pv": result["pv"]}]
+    result["nodes"] = ctx.nodes
+    result["stats"] = ctx.stats(result["depth"])
+    result["elapsed_ms"] = round(ctx.elapsed_ms(), 3)
+    return result
+
+def find_best_move(board:Board, player:int, max_depth:int=4, tt:TranspositionTable=None,
+                   time_ms:float=None, max_nodes:int=None, endgame_empties:int=DEFAULT_ENDGAME_EMPTIES,
+                   workers:int=1, deterministic:bool=True, book=None, pvs:bool=False,
+                   aspiration:int=0):
+    res = search(board, player, max_depth, time_ms=time_ms, max_nodes=max_nodes, tt=tt,
+                 endgame_empties=endgame_empties, workers=workers, deterministic=deterministic,
+                 book=book, pvs=pvs, aspiration=aspiration)
+    return (res["move"], res["pv"], res["score"])
 
 # --- Funciones requeridas por MCP server ---
-def analyze_game(game_id: str, moves: list = None, max_depth: int = 4):
-    """Analiza el estado actual del juego. `moves` opcional."""
+ENGINE_VERSION = 1  # súbela si cambian los resultados de search (invalida las cachés de resultados)
+# Pérdida (mejor score - score de la jugada) a partir de la cual una jugada es error / error grave,
+# según la escala del score: heurística, diferencia exacta de discos o gana/empata/pierde.
+ERROR_THRESHOLDS = {"heuristic": (20, 60), "exact": (4, 10), "wld": (1, 2)}
+
+def _stats_counters(st:dict):
+    return (st["nodes"], st["leaf_evals"], st["cutoffs"], st["tt_hits"])
+
+def _search_cached(cache, board:Board, player:int, max_depth:int, opts:dict):
+    """search() a través de `cache` (othello_cache.ResultCache); un acierto no cuesta nodos.
+    Con `time_ms` no se cachea: el resultado depende del reloj y el presupuesto de cada ply varía."""
+    if cache is None or opts["time_ms"] is not None: return search(board, player, max_depth, **opts)
+    book = opts["book"]
+    key = ("search", board.key(player), player, max_depth, opts["max_nodes"],
+           opts["endgame_empties"], opts["endgame_mode"], opts["multipv"],
+           str(book.path) if book is not None else None, ENGINE_VERSION)
+    hit = cache.get(key)
+    if hit is not None:
+        return {**hit, "nodes": 0, "elapsed_ms": 0.0, "stats": SearchContext().stats(hit["depth"])}
+    res = search(board, player, max_depth, **opts)
+    cache.put(key, {k: v for k, v in res.items() if k not in ("nodes", "elapsed_ms", "stats")})
+    return res
+
+def _played_move_score(board:Board, player:int, r:int, c:int, res:dict, tt:TranspositionTable,
+                       endgame_mode:str, ctx:SearchContext):
+    """Score de jugar (r,c) con la misma medida que `res` (resultado de search en la posición),
+    dentro del presupuesto de `ctx`: profundización hasta res["depth"]-1 quedándose con la
+    última iteración completa. None si el final exacto no cabe en el presupuesto."""
+    child = board.copy()  # una búsqueda abortada deja el tablero a medio deshacer
+    child.make_move(r, c, player)
+    if res["solved"]:
+        own, opp = child._own_opp(-player)
+        try:
+            v = -_solve(own, opp, -65, 65, ctx)
+        except SearchAborted:
+            return None
+        return v if endgame_mode == "exact" else _sign(v)
+    score = None
+    for depth in range(max(res["depth"]-1, 0) + 1):
+        ctx.enforce = depth > 0  # la evaluación estática siempre se completa
+        try:
+            v, _, _ = negamax(child, depth, -player, -1e9, 1e9, tt, ctx)
+        except SearchAborted:
+            break
+        score = -v
+    return score
+
+def analyze_game(game_id: str, moves: list = None, max_depth: int = 4, tt: TranspositionTable = None,
+                 time_ms: float = None, max_nodes: int = None,
+                 endgame_empties: int = DEFAULT_ENDGAME_EMPTIES, endgame_mode: str = "exact",
+                 workers: int = 1, book=None, per_move: bool = True, backend: str = None,
+                 stats: bool = False, cancel: CancelToken = None, multipv: int = 1, cache=None,
+                 deterministic: bool = True):
+    """Analiza la partida jugada a jugada y el estado final (ver README).
+
+    moves: jugadas ("pass" o pases implícitos); una ilegal o mal formada corta el análisis.
+    per_move: compara cada jugada con la del motor (ERROR_THRESHOLDS); False, sólo el final.
+    time_ms: presupuesto de toda la petición. max_nodes: límite de cada búsqueda.
+    tt, cache: tabla de transposición y othello_cache.ResultCache compartidas.
+    backend: implementación del tablero (BACKENDS). stats: añade `stats` sumado.
+    Resto (max_depth, endgame_*, workers, deterministic, book, cancel, multipv): como en `search`.
+    """
     if moves is None:
         moves = []  # juego recién iniciado
-    board = Board()
+    if tt is None: tt = TranspositionTable()
+    max_depth = max(max_depth, 1)  # comparar jugadas necesita al menos una jugada buscada
+    opts = dict(time_ms=time_ms, max_nodes=max_nodes, tt=tt, endgame_empties=endgame_empties,
+                endgame_mode=endgame_mode, workers=workers, deterministic=deterministic, book=book,
+                cancel=cancel, multipv=multipv)
+    board = new_board(backend)
     current = BLACK
-    for mv in moves:
-        board.apply_move(mv, current)
-        current *= -1
-    best_move, pv, val = find_best_move(board, current, max_depth)
-    return {
+    analysis, nodes, invalid = [], 0, None
+    total = SearchContext()  # acumula los contadores de todas las búsquedas
+    deadline = time.perf_counter() + time_ms/1000.0 if time_ms is not None else None
+
+    def budget(i):
+        """Opciones y deadline de la búsqueda del ply `i`: el tiempo que queda repartido entre
+        las búsquedas pendientes (una por jugada más la posición final)."""
+        if deadline is None: return opts, None
+        pending = (sum(1 for m in moves[i:] if m and m.lower() != "pass") if per_move else 0) + 1
+        ms = max((deadline - time.perf_counter()) * 1000.0, 1.0) / pending
+        return dict(opts, time_ms=ms), time.perf_counter() + ms/1000.0
+
+    for i, mv in enumerate(moves):
+        if not mv or mv.lower() == "pass":
+            if not board.has_any_move(current): current = -current
+            continue
+        if not board.has_any_move(current): current = -current  # pase implícito
+        try:
+            coords = move_to_coords(mv)
+        except (ValueError, IndexError):  # token mal formado ("x", "zz")
+            coords = None
+        if coords is None or not board.is_legal(*coords, current):
+            invalid = i
+            break
+        mv = coords_to_move(*coords)  # "D3", " d3" -> "d3", como las jugadas del motor
+        if per_move:
+            ply_opts, ply_deadline = budget(i)
+            res = _search_cached(cache, board, current, max_depth, ply_opts)
+            # la jugada hecha se mide con el mismo deadline y límite de nodos que la búsqueda
+            ctx = SearchContext(max_nodes=max_nodes, cancel=cancel)
+            ctx.deadline = ply_deadline
+            known = {l["move"]: l["score"] for l in res.get("multipv", ())}
+            if mv == res["move"]: score = res["score"]
+            elif mv in known: score = known[mv]
+            else:
+                # sólo sin límite de tiempo el score es reproducible y se puede cachear
+                cacheable = cache is not None and time_ms is None
+                key = ("played", board.key(current), current, mv, res["depth"], res["solved"],
+                       endgame_mode, max_nodes, ENGINE_VERSION)
+                score = cache.get(key) if cacheable else None
+                if score is None:
+                    score = _played_move_score(board, current, *coords, res, tt, endgame_mode, ctx)
+                    if cacheable and score is not None: cache.put(key, score)
+            nodes += res["nodes"] + ctx.nodes
+            total.add_counters(_stats_counters(res["stats"])); total.add_counters(ctx.counters())
+            loss = max(res["score"] - score, 0) if score is not None else None
+            scale = endgame_mode if res["solved"] else "heuristic"
+            mistake, blunder = ERROR_THRESHOLDS[scale]
+            label = None
+            if loss is not None:
+                label = "blunder" if loss >= blunder else "mistake" if loss >= mistake else None
+            analysis.append({
+                "index": i, "player": "B" if current == BLACK else "W", "move": mv,
+                "best_move": res["move"], "score": score, "best_score": res["score"], "loss": loss,
+                "label": label,
+                "depth": res["depth"], "solved": res["solved"], "book": res["book"]})
+            if multipv > 1: analysis[-1]["alternatives"] = res["multipv"]
+        board.apply_move_coords(*coords, current)
+        current = -current
+    if not board.has_any_move(current) and board.has_any_move(-current): current = -current
+    res = _search_cached(cache, board, current, max_depth, budget(len(moves))[0])
+    nodes += res["nodes"]
+    total.add_counters(_stats_counters(res["stats"]))
+    errors = [a for a in analysis if a["label"]]
+    result = {
         "game_id": game_id,
         "current_player": "B" if current == BLACK else "W",
-        "best_move": best_move,
-        "pv": pv,
-        "evaluation": val,
-        "counts": board.counts()
+        "best_move": res["move"],
+        "pv": res["pv"],
+        "evaluation": res["score"],
+        "depth": res["depth"],
+        "solved": res["solved"],
+        "book": res["book"],
+        "counts": board.counts(),
+        "analysis": analysis,
+        "summary": {
+            "moves_count": len(moves),
+            "analyzed": len(analysis),
+            "errors_count": len(errors),
+            "mistakes": sum(a["label"] == "mistake" for a in errors),
+            "blunders": sum(a["label"] == "blunder" for a in errors),
+            "first_error_index": errors[0]["index"] if errors else None,
+            "total_loss": {p: sum(a["loss"] or 0 for a in analysis if a["player"] == p) for p in "BW"},
+            "invalid_move_index": invalid,
+            "nodes": nodes,
+        },
     }
+    if multipv > 1:
+        result["alternatives"] = res["multipv"]
+    if stats:
+        result["stats"] = total.stats(max([a["depth"] for a in analysis] + [res["depth"]]))
+        result["stats"]["searches"] = len(analysis) + 1
+    return result
 
-def board_after_moves(moves: list = None):
+def board_after_moves(moves: list = None, backend: str = None):
     if moves is None:
         moves = []
-    board = Board()
+    board = new_board(backend)
     current = BLACK
     for mv in moves:
         board.apply_move(mv, current)
@@ -0,0 +1,193 @@
+"""Backend de referencia: tablero plano de 64 casillas (índice r*8+c).
+
+Implementa la misma interfaz que othello_engine.Board (ver BOARD_INTERFACE en el motor), así
+que negamax/search/analyze_game funcionan igual con cualquiera de los dos y dan los mismos
+resultados, nodos y claves Zobrist. Es más lento que los bitboards; sirve para comprobar el
+backend rápido y como base legible para otros backends.
+"""
+from othello_engine import (EMPTY, BLACK, WHITE, SQUARE_RAYS, ZOBRIST_BLACK, ZOBRIST_WHITE,
+                            ZOBRIST_FLIP, ZOBRIST_SIDE, coords_to_move, move_to_coords)
+
+CORNERS = (0, 7, 56, 63)
+
+class ListBoard:
+    def __init__(self):
+        self.cells = [EMPTY]*64
+        self.cells[27] = WHITE  # d4
+        self.cells[28] = BLACK  # e4
+        self.cells[35] = BLACK  # d5
+        self.cells[36] = WHITE  # e5
+        self._reset()
+
+    def _reset(self):
+        """Recalcula conteos y hash desde `cells`."""
+        cells = self.cells
+        self.discs = {BLACK: cells.count(BLACK), WHITE: cells.count(WHITE)}  # conteo incremental
+        h = 0
+        for sq, v in enumerate(cells):
+            if v == BLACK: h ^= ZOBRIST_BLACK[sq]
+            elif v == WHITE: h ^= ZOBRIST_WHITE[sq]
+        self.hash = h
+        self._undo = []  # pila de (casilla, volteos, hash previo) para undo_move
+
+    @classmethod
+    def from_bitboards(cls, black:int, white:int):
+        nb = cls.__new__(cls)
+        nb.cells = [BLACK if black >> sq & 1 else WHITE if white >> sq & 1 else EMPTY
+                    for sq in range(64)]
+        nb._reset()
+        return nb
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        nb = cls()
+        nb.b = matrix
+        return nb
+
+    def copy(self):
+        nb = ListBoard.__new__(ListBoard)
+        nb.cells = self.cells[:]
+        nb.discs = dict(self.discs)
+        nb.hash = self.hash
+        nb._undo = []
+        return nb
+
+    # Vista matricial 8x8
+    @property
+    def b(self):
+        return self.to_matrix()
+
+    @b.setter
+    def b(self, matrix):
+        self.cells = [v for row in matrix for v in row]
+        self._reset()
+
+    def to_matrix(self):
+        return [self.cells[r*8:r*8+8] for r in range(8)]
+
+    # Bitboards bajo demanda (solver exacto y búsqueda paralela)
+    def _mask(self, player:int):
+        m = 0
+        for sq, v in enumerate(self.cells):
+            if v == player: m |= 1 << sq
+        return m
+
+    @property
+    def black(self): return self._mask(BLACK)
+
+    @property
+    def white(self): return self._mask(WHITE)
+
+    def _own_opp(self, player:int):
+        return self._mask(player), self._mask(-player)
+
+    def inside(self, r, c): return 0 <= r < 8 and 0 <= c < 8
+
+    def key(self, player:int):
+        return self.hash if player == BLACK else self.hash ^ ZOBRIST_SIDE
+
+    # --- Jugadas ---
+    def _flips(self, sq:int, player:int):
+        """Índices que voltea jugar en `sq`; lista vacía si no es legal."""
+        cells = self.cells
+        out = []
+        for ray in SQUARE_RAYS[sq]:
+            n = 0
+            for i in ray:
+                v = cells[i]
+                if v == -player: n += 1; continue
+                if v == player and n: out.extend(ray[:n])
+                break
+        return out
+
+    def _is_legal(self, sq:int, player:int):
+        """Como _flips pero sin construir la lista: sale en el primer rayo válido."""
+        cells = self.cells
+        opp = -player
+        for ray in SQUARE_RAYS[sq]:
+            if cells[ray[0]] != opp: continue
+            for i in ray[1:]:
+                v = cells[i]
+                if v == opp: continue
+                if v == player: return True
+                break
+        return False
+
+    def legal_moves_mask(self, player:int):
+        cells = self.cells
+        m = 0
+        for sq in range(64):
+            if cells[sq] == EMPTY and self._is_legal(sq, player): m |= 1 << sq
+        return m
+
+    def legal_moves_coords(self, player:int):
+        cells = self.cells
+        return [divmod(sq, 8) for sq in range(64)
+                if cells[sq] == EMPTY and self._is_legal(sq, player)]
+
+    def legal_moves(self, player:int):
+        return [coords_to_move(r, c) for r, c in self.legal_moves_coords(player)]
+
+    def is_legal(self, r:int, c:int, player:int):
+        return self.inside(r, c) and self.cells[r*8+c] == EMPTY and self._is_legal(r*8+c, player)
+
+    def has_any_move(self, player:int):
+        cells = self.cells
+        return any(cells[sq] == EMPTY and self._is_legal(sq, player) for sq in range(64))
+
+    def is_terminal(self):
+        return not (self.has_any_move(BLACK) or self.has_any_move(WHITE))
+
+    # --- Mutación ---
+    def _play(self, sq:int, player:int):
+        flips = self._flips(sq, player)
+        if not flips: return flips
+        cells = self.cells
+        cells[sq] = player
+        h = self.hash ^ (ZOBRIST_BLACK[sq] if player == BLACK else ZOBRIST_WHITE[sq])
+        for i in flips:
+            cells[i] = player
+            h ^= ZOBRIST_FLIP[i]
+        self.hash = h
+        self.discs[player] += len(flips) + 1
+        self.discs[-player] -= len(flips)
+        return flips
+
+    def apply_move_coords(self, r:int, c:int, player:int):
+        if not self.inside(r, c) or self.cells[r*8+c] != EMPTY: return False
+        return bool(self._play(r*8+c, player))
+
+    def make_move(self, r:int, c:int, player:int):
+        """Como apply_move_coords pero apila los volteos para undo_move; devuelve nº de volteos."""
+        sq = r*8+c
+        if self.cells[sq] != EMPTY: return 0
+        prev_hash = self.hash
+        flips = self._play(sq, player)
+        if flips: self._undo.append((sq, flips, prev_hash))
+        return len(flips)
+
+    def undo_move(self):
+        sq, flips, self.hash = self._undo.pop()
+        cells = self.cells
+        player = cells[sq]
+        cells[sq] = EMPTY
+        for i in flips: cells[i] = -player
+        self.discs[player] -= len(flips) + 1
+        self.discs[-player] += len(flips)
+
+    def apply_move(self, move:str, player:int):
+        if not move or move.lower() == "pass": return True
+        coords = move_to_coords(move)
+        if coords is None: return False
+        return self.apply_move_coords(*coords, player)
+
+    # --- Evaluación ---
+    def counts(self):
+        return {"black": self.discs[BLACK], "white": self.discs[WHITE]}
+
+    def evaluate(self):
+        """Misma heurística que othello_engine.Board.evaluate (punto de vista de BLACK)."""
+        disc_diff = self.discs[BLACK] - self.discs[WHITE]
+        corner_score = 25*sum(self.cells[i] for i in CORNERS)
+        mobility = len(self.legal_moves_coords(BLACK)) - len(self.legal_moves_coords(WHITE))
+        return disc_diff + 10*mobility + corner_score
@@ -0,0 +1,180 @@
+"""Formato binario compacto para partidas: un byte por jugada.
+
+Archivo (little endian):
+    cabecera  8s magic "OTHGAME1"
+    partidas  B nº de jugadas | B discos negras | B discos blancas | B flags | H bytes de metadata
+              metadata (JSON compacto utf-8, puede estar vacía) | jugadas (casilla r*8+c, 64 = pasar)
+El resultado (discos finales y flag FINISHED) se calcula al escribir rejugando la partida, así
+que leer un archivo no requiere rejugar nada. Un archivo puede tener una o muchas partidas y
+se puede ampliar añadiendo registros al final.
+
+Uso:
+    python othello_record.py convert --out archive.ogr games/*.json partida.txt selfplay.txt
+    python othello_record.py info archive.ogr
+    python othello_record.py dump archive.ogr --index 3
+"""
+import argparse
+import json
+import struct
+from pathlib import Path
+
+from othello_engine import Board, BLACK, coords_to_move, move_to_coords
+from selfplay import parse_game
+
+MAGIC = b"OTHGAME1"
+RECORD = struct.Struct("<BBBBH")
+PASS = 64
+FINISHED = 1
+SQUARE_NAMES = [coords_to_move(*divmod(sq, 8)) for sq in range(64)] + ["pass"]
+FORMATS = ("auto", "binary", "json", "lines", "selfplay")
+
+# --- Jugadas ---
+def encode_moves(moves):
+    out = bytearray()
+    for mv in moves:
+        if not mv or mv.lower() == "pass":
+            out.append(PASS); continue
+        m = mv.strip().lower()
+        if len(m) != 2 or m[0] not in "abcdefgh" or m[1] not in "12345678":
+            raise ValueError(f"invalid move {mv!r}")
+        row, col = move_to_coords(m)
+        out.append(row*8 + col)
+    return bytes(out)
+
+def decode_moves(data):
+    return [SQUARE_NAMES[b] for b in data]
+
+def game_result(moves):
+    """(discos negras, discos blancas, terminada) rejugando; ValueError si hay jugada ilegal."""
+    b, player = Board(), BLACK
+    for i, mv in enumerate(moves):
+        if not mv or mv.lower() == "pass":
+            if not b.has_any_move(player): player = -player
+            continue
+        if not b.has_any_move(player): player = -player  # pase implícito
+        if not b.apply_move(mv, player):
+            raise ValueError(f"illegal move {mv!r} at index {i}")
+        player = -player
+    c = b.counts()
+    return c["black"], c["white"], b.is_terminal()
+
+# --- Lectura / escritura ---
+def _pack(moves, metadata=None):
+    data = encode_moves(moves)
+    if len(data) > 255:
+        raise ValueError("too many moves for one record")
+    meta = json.dumps(metadata, separators=(",", ":")).encode("utf-8") if metadata else b""
+    black, white, finished = game_result(moves)
+    return RECORD.pack(len(data), black, white, FINISHED if finished else 0, len(meta)) + meta + data
+
+def write_games(path, games, append:bool=False):
+    """Escribe partidas ({"moves", "metadata"} o listas de jugadas). Devuelve cuántas."""
+    path = Path(path)
+    append = append and path.exists() and path.stat().st_size > 0
+    n = 0
+    with path.open("ab" if append else "wb") as fh:
+        if not append: fh.write(MAGIC)
+        for g in games:
+            if isinstance(g, dict): fh.write(_pack(g.get("moves", []), g.get("metadata")))
+            else: fh.write(_pack(g))
+            n += 1
+    return n
+
+def save_game(path, moves, metadata=None):
+    write_games(path, [{"moves": moves, "metadata": metadata}])
+
+def iter_records(data, skip:int=0):
+    """Partidas de un buffer binario completo (bytes o mmap); `skip` salta registros sin decodificarlos."""
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a game record file")
+    off, end = len(MAGIC), len(data)
+    for _ in range(skip):
+        if off >= end: return
+        n, _, _, _, meta_len = RECORD.unpack_from(data, off)
+        off += RECORD.size + meta_len + n
+    while off < end:
+        n, black, white, flags, meta_len = RECORD.unpack_from(data, off)
+        off += RECORD.size
+        meta = json.loads(bytes(data[off:off+meta_len]).decode("utf-8")) if meta_len else {}
+        off += meta_len
+        yield {"moves": decode_moves(data[off:off+n]), "metadata": meta,
+               "result": {"black": black, "white": white, "finished": bool(flags & FINISHED)}}
+        off += n
+
+def read_games(path, skip:int=0):
+    return iter_records(Path(path).read_bytes(), skip)
+
+def load_game(path, index:int=0):
+    for g in read_games(path, skip=index):
+        return g
+    raise IndexError(f"{path} has no game {index}")
+
+def is_record_file(path):
+    with Path(path).open("rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+# --- Otros formatos ---
+def _detect(path, text):
+    if text.lstrip().startswith("{"): return "json"
+    first = next((l.split() for l in text.splitlines() if l.strip()), [])
+    if len(first) == 3 and first[1].isdigit() and first[2].isdigit(): return "selfplay"
+    return "lines"
+
+def read_game_file(path, fmt:str="auto"):
+    """Partidas de un archivo en cualquiera de los formatos soportados (lista de dicts)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    if fmt == "binary" or fmt == "auto" and is_record_file(path):
+        return list(read_games(path))
+    text = Path(path).read_text(encoding="utf-8")
+    if fmt == "auto": fmt = _detect(path, text)
+    if fmt == "json":
+        payload = json.loads(text)
+        return [{"moves": payload.get("moves", []), "metadata": payload.get("metadata", {})}]
+    if fmt == "selfplay":
+        return [{"moves": parse_game(l)[0], "metadata": {}} for l in text.splitlines() if l.strip()]
+    # una jugada por línea; '#' inicia un comentario
+    moves = [l.split("#", 1)[0].strip() for l in text.splitlines()]
+    return [{"moves": [m for m in moves if m], "metadata": {}}]
+
+def convert(inputs, out, fmt:str="auto", append:bool=False):
+    """Convierte archivos de partidas a un único archivo binario. Devuelve nº de partidas."""
+    def games():
+        for p in inputs:
+            games = read_game_file(p, fmt)
+            for g in games:
+                meta = dict(g.get("metadata") or {})
+                if len(games) == 1: meta.setdefault("source", Path(p).name)  # archivo = partida
+                yield {"moves": g["moves"], "metadata": meta}
+    return write_games(out, games(), append=append)
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd")
+    p = sub.add_parser("convert")
+    p.add_argument("--out", required=True)
+    p.add_argument("--format", choices=FORMATS, default="auto")
+    p.add_argument("--append", action="store_true")
+    p.add_argument("inputs", nargs="+")
+    p = sub.add_parser("info")
+    p.add_argument("path")
+    p = sub.add_parser("dump")
+    p.add_argument("path")
+    p.add_argument("--index", type=int, default=0)
+    args = parser.parse_args()
+    if args.cmd == "convert":
+        n = convert(args.inputs, args.out, args.format, args.append)
+        print(f"{n} partidas escritas en {args.out}")
+    elif args.cmd == "info":
+        games = moves = 0
+        for g in read_games(args.path):
+            games += 1; moves += len(g["moves"])
+        size = Path(args.path).stat().st_size
+        print(f"{games} partidas, {moves} jugadas, {size} bytes")
+    elif args.cmd == "dump":
+        print(json.dumps(load_game(args.path, args.index), indent=2))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
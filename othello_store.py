@@ -0,0 +1,237 @@
+"""Almacén persistente de partidas en SQLite (modo WAL) con caché caliente acotada.
+
+Tablas:
+    games      game_id (clave primaria) | created (índice) | source (índice) | moves | moves_count
+               | metadata (JSON) | analysis (JSON, NULL hasta analizarla)
+    game_meta  game_id | key | value (JSON), índice (key, value): búsquedas por metadata
+Las jugadas se guardan con othello_record.encode_moves (un byte por jugada) o como JSON si
+alguna no es una casilla. Abrir el almacén no lee partidas: el arranque no depende del tamaño
+del archivo. `get` no trae el análisis (se lee aparte con `analysis`) y sólo las últimas
+`hot_size` partidas usadas quedan en memoria.
+
+Uso:
+    python othello_store.py import --db games/games.sqlite3 games/*.json archive.ogr
+    python othello_store.py info --db games/games.sqlite3
+    python othello_store.py find --db games/games.sqlite3 --after 2025-01-01 --meta generated=true
+"""
+import argparse
+import json
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from othello_record import decode_moves, encode_moves, read_game_file
+
+DEFAULT_HOT_SIZE = 1024
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    source TEXT,
+    moves BLOB NOT NULL,
+    moves_count INTEGER NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    analysis TEXT
+);
+CREATE INDEX IF NOT EXISTS games_created ON games(created);
+CREATE INDEX IF NOT EXISTS games_source ON games(source);
+CREATE TABLE IF NOT EXISTS game_meta (
+    game_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (game_id, key)
+);
+CREATE INDEX IF NOT EXISTS game_meta_kv ON game_meta(key, value);
+"""
+
+def _dump(value):
+    return json.dumps(value, separators=(",", ":"))
+
+def _pack_moves(moves):
+    try:
+        return encode_moves(moves)
+    except (ValueError, IndexError):
+        return _dump(moves)  # jugadas que no son casillas: se guardan tal cual
+
+def _unpack_moves(data):
+    return decode_moves(data) if isinstance(data, bytes) else json.loads(data)
+
+class GameStore:
+    """Partidas por game_id. Una conexión por hilo (el servidor usa varios) y una caché LRU de
+    `hot_size` partidas (jugadas, metadata, creación) delante de la base."""
+    def __init__(self, path, hot_size:int=DEFAULT_HOT_SIZE):
+        self.path = str(path)
+        self.hot_size = hot_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()
+        self.hits = self.misses = 0
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close(); self._local.conn = None
+
+    # --- Caché caliente ---
+    def _remember(self, game_id, entry):
+        with self._lock:
+            self._hot[game_id] = entry
+            self._hot.move_to_end(game_id)
+            while len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)
+
+    def _cached(self, game_id):
+        with self._lock:
+            entry = self._hot.get(game_id)
+            if entry is not None:
+                self._hot.move_to_end(game_id)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    # --- Escritura ---
+    def add(self, game_id, moves, metadata=None, source=None, analysis=None, created=None):
+        """Guarda (o reemplaza) una partida. Devuelve su game_id."""
+        self.add_many([{"game_id": game_id, "moves": moves, "metadata": metadata, "source": source,
+                        "analysis": analysis, "created": created}])
+        return game_id
+
+    def add_many(self, games):
+        """Guarda partidas (dicts como los de `add`) en una sola transacción. Devuelve cuántas."""
+        rows, meta, entries = [], [], []
+        for g in games:
+            gid = str(g.get("game_id") or uuid.uuid4())
+            metadata = g.get("metadata") or {}
+            moves = list(g.get("moves") or [])
+            analysis = g.get("analysis")
+            created = g.get("created") or datetime.utcnow().isoformat()
+            rows.append((gid, created, g.get("source"), _pack_moves(moves), len(moves),
+                         _dump(metadata), _dump(analysis) if analysis is not None else None))
+            meta.extend((gid, k, _dump(v)) for k, v in metadata.items())
+            entries.append((gid, {"moves": moves, "metadata": metadata, "created": created,
+                                  "source": g.get("source")}))
+        conn = self._conn()
+        with conn:
+            conn.executemany("DELETE FROM game_meta WHERE game_id = ?", [(r[0],) for r in rows])
+            conn.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO game_meta VALUES (?, ?, ?)", meta)
+        for gid, entry in entries[-self.hot_size:]:
+            self._remember(gid, entry)
+        return len(rows)
+
+    def set_analysis(self, game_id, analysis):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("UPDATE games SET analysis = ? WHERE game_id = ?",
+                               (_dump(analysis), game_id))
+        if not cur.rowcount:
+            raise KeyError(game_id)
+
+    # --- Lectura ---
+    def get(self, game_id):
+        """{"moves", "metadata", "created", "source"} de la partida, o None. Sin el análisis."""
+        entry = self._cached(game_id)
+        if entry is not None: return entry
+        row = self._conn().execute(
+            "SELECT moves, metadata, created, source FROM games WHERE game_id = ?",
+            (game_id,)).fetchone()
+        if row is None: return None
+        entry = {"moves": _unpack_moves(row[0]), "metadata": json.loads(row[1]),
+                 "created": row[2], "source": row[3]}
+        self._remember(game_id, entry)
+        return entry
+
+    def analysis(self, game_id):
+        """Último análisis guardado de la partida, o None."""
+        row = self._conn().execute("SELECT analysis FROM games WHERE game_id = ?",
+                                   (game_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def __contains__(self, game_id):
+        return self._cached(game_id) is not None or self._conn().execute(
+            "SELECT 1 FROM games WHERE game_id = ?", (game_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def find(self, created_after=None, created_before=None, source=None, metadata=None,
+             limit:int=100, offset:int=0):
+        """Resúmenes (game_id, created, source, moves_count, analyzed) por fecha de creación,
+        origen y valores exactos de metadata, de la más reciente a la más antigua."""
+        where, args = [], []
+        if created_after: where.append("g.created >= ?"); args.append(created_after)
+        if created_before: where.append("g.created < ?"); args.append(created_before)
+        if source: where.append("g.source = ?"); args.append(source)
+        for k, v in (metadata or {}).items():
+            where.append("EXISTS (SELECT 1 FROM game_meta m WHERE m.game_id = g.game_id"
+                         " AND m.key = ? AND m.value = ?)")
+            args.extend((k, _dump(v)))
+        sql = ("SELECT game_id, created, source, moves_count, analysis IS NOT NULL FROM games g"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY created DESC LIMIT ? OFFSET ?")
+        rows = self._conn().execute(sql, args + [int(limit), int(offset)]).fetchall()
+        return [{"game_id": r[0], "created": r[1], "source": r[2], "moves_count": r[3],
+                 "analyzed": bool(r[4])} for r in rows]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"path": self.path, "hot_entries": len(self._hot), "hot_size": self.hot_size,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits/lookups if lookups else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd")
+    p = sub.add_parser("import")
+    p.add_argument("--db", required=True)
+    p.add_argument("inputs", nargs="+")
+    p = sub.add_parser("info")
+    p.add_argument("--db", required=True)
+    p = sub.add_parser("find")
+    p.add_argument("--db", required=True)
+    p.add_argument("--after")
+    p.add_argument("--before")
+    p.add_argument("--source")
+    p.add_argument("--meta", nargs="*", default=[], help="clave=valor (valor JSON)")
+    p.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    if args.cmd == "import":
+        store, n = GameStore(args.db), 0
+        for path in args.inputs:
+            games = read_game_file(path)
+            n += store.add_many({"moves": g["moves"], "metadata": g.get("metadata"),
+                                 "source": Path(path).name} for g in games)
+        print(f"{n} partidas importadas en {args.db}")
+    elif args.cmd == "info":
+        store = GameStore(args.db)
+        size = Path(args.db).stat().st_size
+        print(f"{len(store)} partidas, {size} bytes")
+    elif args.cmd == "find":
+        meta = {}
+        for kv in args.meta:
+            k, v = kv.split("=", 1)
+            try: meta[k] = json.loads(v)
+            except ValueError: meta[k] = v  # texto sin comillas
+        for g in GameStore(args.db).find(args.after, args.before, args.source, meta, args.limit):
+            print(json.dumps(g))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,12 @@ class OthelloUIInteractive:
 
     def print_board(self):
         legal_coords = [move_to_coords(mv) for mv in self.engine.get_legal_moves()]
+        matrix=self.engine.board.to_matrix()
         print("\n  A B C D E F G H")
         for r in range(8):
             row_str=str(r+1)+" "
             for c in range(8):
-                cell=self.engine.board.b[r][c]
+                cell=matrix[r][c]
                 pos=(r,c)
                 # Resaltar última jugada
                 if self.last_move==pos:
@@ -36,12 +37,15 @@ class OthelloUIInteractive:
             self.print_board()
             pv=self.engine.get_pv(max_depth=3)
             self.print_pv(pv)
+            self.engine.start_pondering()  # busca las respuestas mientras se espera la jugada
             player_str="B" if self.engine.current_color==BLACK else "W"
             print(f"Turno: {player_str}")
             move=None
             while True:
                 move=input("Ingresa jugada (ej: d3) o 'pass': ").strip().lower()
-                if move=="q": return
+                if move=="q":
+                    self.engine.stop_pondering()
+                    return
                 # Validar jugada
                 if move=="pass" or move in self.engine.get_legal_moves():
                     ok=self.engine.apply_move(move)
@@ -2,7 +2,7 @@ from othello_engine_adapter import OthelloEngineInteractive
 from othello_ui_interactive import OthelloUIInteractive
 
 def main():
-    engine=OthelloEngineInteractive()
+    engine=OthelloEngineInteractive(ponder=True)
     ui=OthelloUIInteractive(engine)
     print("\n¡Bienvenido a Othello Interactive!")
     print("Usa letras a-h y números 1-8 para mover, 'pass' para pasar, 'q' para salir.\n")
@@ -0,0 +1,135 @@
+"""Generador de partidas por autojuego: aleatorias, motor contra motor o epsilon-greedy.
+
+Cada partida i usa su propia semilla derivada de (seed, i), así que el resultado no depende
+del número de procesos: con la misma semilla se obtiene el mismo archivo. Las partidas se
+añaden al final del archivo, una por línea:
+
+    d3c5f6f5e6e3... 40 24      jugadas concatenadas (pases implícitos), discos negras, blancas
+
+Uso:
+    python selfplay.py --games 100000 --out selfplay.txt                  # aleatorias
+    python selfplay.py --games 1000 --mode engine --depth 2 --random-plies 6 --workers 4
+    python selfplay.py --games 1000 --mode epsilon --depth 3 --epsilon 0.1 --start 1000
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from othello_engine import (BLACK, DEFAULT_ENDGAME_EMPTIES, Board, TranspositionTable,
+                            coords_to_move, flips_mask, iter_bits, move_to_coords, moves_mask,
+                            search)
+
+MODES = ("random", "engine", "epsilon")
+CHUNK_GAMES = 64  # partidas por tarea enviada a cada proceso
+PROGRESS_EVERY = 10000
+GAME_TT_SIZE = 1 << 14  # tabla propia por partida: el resultado no depende de partidas previas
+SQUARE_NAMES = [coords_to_move(*divmod(sq, 8)) for sq in range(64)]
+
+def game_seed(seed:int, index:int):
+    return (seed << 32) | index
+
+def play_game(seed:int, depths=(0, 0), epsilon:float=0.0, random_plies:int=0,
+              endgame_empties:int=DEFAULT_ENDGAME_EMPTIES):
+    """Juega una partida completa. `depths` = (negras, blancas); 0 = jugador aleatorio.
+
+    Las primeras `random_plies` jugadas y, después, cada jugada con probabilidad `epsilon`
+    son aleatorias. Devuelve (jugadas, discos negras, discos blancas).
+    """
+    rng = random.Random(seed)
+    start = Board()
+    black, white, player, moves = start.black, start.white, BLACK, []
+    tt = TranspositionTable(GAME_TT_SIZE) if any(depths) else None
+    while True:
+        # directamente sobre bitboards: el tablero completo sólo hace falta para el motor
+        own, opp = (black, white) if player == BLACK else (white, black)
+        legal = moves_mask(own, opp)
+        if not legal:
+            if not moves_mask(opp, own): break
+            player = -player
+            continue
+        depth = depths[0] if player == BLACK else depths[1]
+        if depth and len(moves) >= random_plies and not (epsilon and rng.random() < epsilon):
+            res = search(Board.from_bitboards(black, white), player, depth, tt=tt,
+                         endgame_empties=endgame_empties)
+            r, c = move_to_coords(res["move"])
+            sq = r*8 + c
+        else:
+            sq = rng.choice(list(iter_bits(legal)))
+        f = flips_mask(own, opp, sq)
+        own, opp = own | f | (1 << sq), opp ^ f
+        black, white = (own, opp) if player == BLACK else (opp, own)
+        moves.append(SQUARE_NAMES[sq])
+        player = -player
+    return moves, black.bit_count(), white.bit_count()
+
+def format_game(moves, black:int, white:int):
+    return f"{''.join(moves)} {black} {white}\n"
+
+def parse_game(line:str):
+    """Inversa de format_game: (jugadas, discos negras, discos blancas)."""
+    moves, black, white = line.split()
+    return [moves[i:i+2] for i in range(0, len(moves), 2)], int(black), int(white)
+
+def read_games(path):
+    with open(path, encoding="ascii") as fh:
+        for line in fh:
+            if line.strip(): yield parse_game(line)
+
+def _play_chunk(seed:int, start:int, count:int, options:dict):
+    return "".join(format_game(*play_game(game_seed(seed, i), **options))
+                   for i in range(start, start + count))
+
+def generate(out, games:int, seed:int=0, start:int=0, workers:int=1, progress:bool=False,
+             **options):
+    """Añade `games` partidas (índices start..start+games-1) a `out`; `options` va a play_game.
+
+    Con `workers` > 1 reparte bloques de CHUNK_GAMES partidas entre procesos y escribe los
+    bloques en orden a medida que terminan. Devuelve el número de partidas escritas.
+    """
+    chunks = [(s, min(CHUNK_GAMES, start + games - s)) for s in range(start, start + games, CHUNK_GAMES)]
+    t0, written = time.perf_counter(), 0
+    with open(out, "a", encoding="ascii") as fh:
+        def emit(block, count):
+            nonlocal written
+            fh.write(block); fh.flush()
+            written += count
+            if progress and (written % PROGRESS_EVERY < count or written == games):
+                rate = written / max(time.perf_counter() - t0, 1e-9)
+                print(f"{written}/{games} partidas, {rate:.0f} partidas/s")
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as ex:
+                futures = [ex.submit(_play_chunk, seed, s, n, options) for s, n in chunks]
+                for f, (_, n) in zip(futures, chunks):  # en orden: archivo reproducible
+                    emit(f.result(), n)
+        else:
+            for s, n in chunks:
+                emit(_play_chunk(seed, s, n, options), n)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--out", default="selfplay.txt")
+    parser.add_argument("--mode", choices=MODES, default="random")
+    parser.add_argument("--depth", type=int, default=2, help="profundidad del motor (negras)")
+    parser.add_argument("--white-depth", type=int, help="profundidad de blancas (por defecto --depth)")
+    parser.add_argument("--epsilon", type=float, default=0.1, help="modo epsilon: prob. de jugada aleatoria")
+    parser.add_argument("--random-plies", type=int, default=4, help="jugadas aleatorias iniciales (motor)")
+    parser.add_argument("--endgame-empties", type=int, default=DEFAULT_ENDGAME_EMPTIES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="índice de la primera partida")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    options = {}
+    if args.mode != "random":
+        white = args.depth if args.white_depth is None else args.white_depth
+        options = {"depths": (args.depth, white), "random_plies": args.random_plies,
+                   "endgame_empties": args.endgame_empties,
+                   "epsilon": args.epsilon if args.mode == "epsilon" else 0.0}
+    n = generate(args.out, args.games, args.seed, args.start, args.workers, progress=True, **options)
+    print(f"{n} partidas añadidas a {args.out}")
+
+if __name__ == "__main__":
+    main()
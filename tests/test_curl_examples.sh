@@ -14,3 +14,19 @@ curl -sS -X POST $URL -H "Content-Type: application/json" -d '{
 }' | jq
 
 # (sustituye <GAME_ID> por el id que obtengas en el resultado del anterior)
+
+echo "3) Analyze in the background (returns a job_id at once):"
+curl -sS -X POST $URL -H "Content-Type: application/json" -d '{
+  "jsonrpc":"2.0",
+  "id":2,
+  "method":"submit",
+  "params": {"method":"analyze_game", "job_id":"demo", "params": {"game_id":"<GAME_ID>", "max_depth":6}}
+}' | jq
+
+echo "4) Wait up to 5 s for the result:"
+curl -sS -X POST $URL -H "Content-Type: application/json" -d '{
+  "jsonrpc":"2.0",
+  "id":3,
+  "method":"job_result",
+  "params": {"job_id":"demo", "wait_ms":5000}
+}' | jq
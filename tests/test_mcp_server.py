@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+import time
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+os.environ.setdefault("OTHELLO_STORE_PATH", os.path.join(tempfile.mkdtemp(), "games.sqlite3"))
+
+from fastapi.testclient import TestClient
+from othello_engine import SearchCancelled
+import mcp_othello_server as srv
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(srv, "JOBS", {})
+    with TestClient(srv.app) as c:
+        yield c
+
+@pytest.fixture
+def blocking(monkeypatch):
+    """Método de job "block": ocupa un trabajador hasta `gate.set()` o hasta que lo cancelen."""
+    gate, started = threading.Event(), threading.Semaphore(0)
+    def run(params, cancel):
+        started.release()
+        while not gate.is_set():
+            if cancel.cancelled: raise SearchCancelled()
+            time.sleep(0.01)
+        return {"ok": True}
+    monkeypatch.setitem(srv.JOB_METHODS, "block", run)
+    yield gate, started
+    gate.set()
+
+def call(client, method, params=None, id_=1):
+    return client.post("/rpc", json={"jsonrpc": "2.0", "id": id_, "method": method,
+                                     "params": params or {}}).json()
+
+def fill_pool(client, blocking):
+    """Un job "block" en marcha por trabajador: lo siguiente que se envíe queda en cola."""
+    gate, started = blocking
+    ids = [call(client, "submit", {"method": "block"})["result"]["job_id"]
+           for _ in range(srv.JOB_WORKERS)]
+    for _ in ids:
+        assert started.acquire(timeout=5)
+    return ids
+
+def test_submit_returns_at_once_and_cancels_running_job(client, blocking):
+    t0 = time.perf_counter()
+    job = call(client, "submit", {"method": "block"})["result"]
+    assert time.perf_counter() - t0 < 2 and job["status"] in srv.JOB_PENDING
+    assert blocking[1].acquire(timeout=5)
+    assert call(client, "job_status", {"job_id": job["job_id"]})["result"]["status"] == "running"
+    assert call(client, "cancel", {"job_id": job["job_id"]})["result"]["cancelled"]
+    res = call(client, "job_result", {"job_id": job["job_id"], "wait_ms": 5000})
+    assert res["error"]["code"] == srv.SEARCH_CANCELLED
+    assert srv.JOBS[job["job_id"]]["status"] == "cancelled"
+    assert not call(client, "cancel", {"job_id": job["job_id"]})["result"]["cancelled"]
+
+def test_cancel_queued_job_never_runs(client, blocking):
+    fill_pool(client, blocking)
+    job = call(client, "submit", {"method": "block", "job_id": "queued-1"})["result"]
+    assert job == {**job, "job_id": "queued-1", "status": "queued"}
+    assert call(client, "cancel", {"job_id": "queued-1"})["result"]["cancelled"]
+    blocking[0].set()
+    res = call(client, "job_result", {"job_id": "queued-1", "wait_ms": 5000})
+    assert res["error"]["code"] == srv.SEARCH_CANCELLED
+    assert srv.JOBS["queued-1"]["started"] is None
+
+def test_deadline_expires_while_queued(client, blocking):
+    fill_pool(client, blocking)
+    job = call(client, "submit", {"method": "block", "deadline_ms": 50})["result"]
+    time.sleep(0.1)
+    res = call(client, "job_result", {"job_id": job["job_id"], "wait_ms": 1000})
+    assert res["error"]["code"] == srv.SEARCH_CANCELLED
+    assert srv.JOBS[job["job_id"]]["status"] == "cancelled"
+    assert srv.JOBS[job["job_id"]]["started"] is None
+
+def test_sync_analyze_game_returns_result(client):
+    res = call(client, "analyze_game", {"moves": ["d3", "c5", "f6"], "max_depth": 2})["result"]
+    assert res["analysis_length"] == 3 and res["job_id"]
+    assert srv.GAMES.analysis(res["game_id"])["summary"] == res["analysis_summary"]["summary"]
+    assert srv.JOBS[res["job_id"]]["status"] == "done"
+
+def test_max_depth_below_one_is_rejected(client):
+    res = call(client, "analyze_game", {"moves": ["d3"], "max_depth": 0})
+    assert res["error"]["code"] == -32000 and "max_depth" in res["error"]["message"]
+
+def test_finished_jobs_beyond_history_are_forgotten(client, monkeypatch):
+    monkeypatch.setattr(srv, "JOB_HISTORY", 2)
+    monkeypatch.setitem(srv.JOB_METHODS, "noop", lambda params, cancel: {})
+    ids = []
+    for i in range(4):
+        ids.append(call(client, "submit", {"method": "noop"})["result"]["job_id"])
+        res = call(client, "job_result", {"job_id": ids[-1], "wait_ms": 5000})
+        assert res["result"]["status"] == "done"
+    # al enviar el cuarto quedaban tres terminados: se olvida el más antiguo
+    assert list(srv.JOBS) == ids[1:]
+    assert "not found" in call(client, "job_status", {"job_id": ids[0]})["error"]["message"]
+
+def batch(client, calls):
+    return client.post("/rpc", json=calls)
+
+def rpc_call(method, params=None, id_=None):
+    payload = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+    if id_ is not None: payload["id"] = id_
+    return payload
+
+def test_batch_answers_in_order_without_notifications(client, monkeypatch):
+    def nap(params, cancel):
+        time.sleep(params["s"])
+        return {"s": params["s"]}
+    monkeypatch.setitem(srv.JOB_METHODS, "nap", nap)
+    resp = batch(client, [rpc_call("nap", {"s": 0.3}, "a"), rpc_call("nap", {"s": 0.0}),
+                          rpc_call("nap", {"s": 0.0}, "b"), rpc_call("engine_stats", id_=3)])
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["id"] for r in body] == ["a", "b", 3]
+    assert body[0]["result"]["s"] == 0.3 and "transposition_table" in body[2]["result"]
+
+def test_batch_of_notifications_returns_204(client):
+    resp = batch(client, [rpc_call("engine_stats"), rpc_call("find_games")])
+    assert resp.status_code == 204 and not resp.content
+
+def test_batch_invalid_entries(client):
+    assert batch(client, []).json()["error"]["code"] == -32600
+    body = batch(client, [1, rpc_call("nope", id_=7), rpc_call("engine_stats", id_=8)]).json()
+    assert body[0] == {"jsonrpc": "2.0", "id": None,
+                       "error": {"code": -32600, "message": "Invalid Request"}}
+    assert body[1]["id"] == 7 and body[1]["error"]["code"] == -32601
+    assert body[2]["id"] == 8 and "result" in body[2]
@@ -0,0 +1,59 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from othello_engine import Board, BLACK, WHITE, iter_bits
+import othello_batch as ob
+
+def _random_boards(n, seed=5):
+    rng = random.Random(seed)
+    boards, players = [], []
+    for _ in range(n):
+        b, player = Board(), BLACK
+        for _ in range(rng.randint(0, 55)):
+            moves = b.legal_moves_coords(player)
+            if moves:
+                b.apply_move_coords(*rng.choice(moves), player)
+            player = -player
+        boards.append(b)
+        players.append(player)
+    return boards, np.array(players, dtype=np.int8)
+
+def test_conversions_roundtrip():
+    boards, _ = _random_boards(20)
+    arr = np.array([b.to_matrix() for b in boards], dtype=np.int8)
+    black, white = ob.as_bitboards(arr)
+    assert black.dtype == np.uint64
+    assert [int(x) for x in black] == [b.black for b in boards]
+    assert (ob.to_arrays(black, white) == arr).all()
+
+def test_batch_matches_board():
+    boards, players = _random_boards(200)
+    black, white = ob.from_boards(boards)
+    moves = ob.legal_moves(black, white, players)
+    scores = ob.evaluate(black, white)
+    counts = ob.counts(black, white)
+    for i, b in enumerate(boards):
+        assert int(moves[i]) == b.legal_moves_mask(int(players[i]))
+        assert scores[i] == b.evaluate()
+        assert tuple(counts[i]) == (b.counts()["black"], b.counts()["white"])
+
+def test_apply_moves_matches_board():
+    boards, players = _random_boards(200, seed=9)
+    black, white = ob.from_boards(boards)
+    moves = ob.legal_moves(black, white, players)
+    # primera jugada legal de cada tablero (o pasar)
+    squares = np.array([next(iter_bits(int(m)), -1) for m in moves])
+    nb, nw, flips = ob.apply_moves(black, white, players, squares)
+    for i, b in enumerate(boards):
+        before = b.copy()
+        if squares[i] >= 0:
+            assert b.apply_move_coords(*divmod(int(squares[i]), 8), int(players[i]))
+        assert (int(nb[i]), int(nw[i])) == (b.black, b.white)
+        # volteados = discos que cambiaron de color
+        assert int(flips[i]) == (before.black ^ b.black) & (before.white ^ b.white)
+    # jugada ilegal: tablero sin cambios
+    nb, nw, flips = ob.apply_moves(black[:1], white[:1], BLACK, np.array([0]))
+    if not Board.from_bitboards(int(black[0]), int(white[0])).is_legal(0, 0, BLACK):
+        assert int(flips[0]) == 0 and int(nb[0]) == int(black[0])
@@ -0,0 +1,37 @@
+import pickle
+
+from othello_engine import Board, BLACK, WHITE, board_after_moves, search, find_best_move
+from othello_book import OpeningBook, build_book, opening_positions
+
+def test_opening_positions_unique():
+    positions = opening_positions(2)
+    keys = [b.key(p) for b, p in positions]
+    assert len(keys) == len(set(keys))
+    # inicio + 4 jugadas de BLACK + 12 respuestas de WHITE
+    assert len(positions) == 1 + 4 + 12
+
+def test_build_and_lookup(tmp_path):
+    path = tmp_path / "book.bin"
+    n = build_book(path, plies=2, depth=2)
+    assert n == 17
+    with OpeningBook(path) as book:
+        assert len(book) == n
+        b = board_after_moves(["d3"])
+        hit = book.probe(b, WHITE)
+        assert hit["move"] == search(b, WHITE, 2)["move"]
+        assert hit["pv"][0] == hit["move"]
+        # fuera del libro
+        assert book.probe(board_after_moves(["d3", "c5", "f6"]), BLACK) is None
+        assert book.stats()["hits"] >= 1 and book.stats()["misses"] >= 1
+
+def test_search_uses_book_and_pickles_by_path(tmp_path):
+    path = tmp_path / "book.bin"
+    build_book(path, plies=1, depth=3)
+    book = OpeningBook(path)
+    res = search(Board(), BLACK, 5, book=book)
+    assert res["book"] and res["nodes"] == 0 and res["depth"] == 3
+    assert find_best_move(Board(), BLACK, 5, book=book)[0] == res["move"]
+    clone = pickle.loads(pickle.dumps(book))
+    assert clone.probe(Board(), BLACK)["move"] == res["move"]
+    assert not search(board_after_moves(["d3", "c5"]), BLACK, 2, book=book)["book"]
+    clone.close(); book.close()
@@ -0,0 +1,39 @@
+import pytest
+from othello_engine import analyze_game, ENGINE_VERSION
+from othello_cache import ResultCache
+
+MOVES = ["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3"]
+
+def test_cache_reuses_positions_across_games():
+    cache = ResultCache()
+    first = analyze_game("a", MOVES, max_depth=3, cache=cache)
+    assert cache.hits == 0 and len(cache) > 0
+    again = analyze_game("b", MOVES, max_depth=3, cache=cache)
+    assert again["analysis"] == first["analysis"] and again["best_move"] == first["best_move"]
+    assert again["summary"]["nodes"] == 0 and cache.stats()["hit_rate"] > 0
+    # mismo prefijo, otra continuación: sólo las posiciones nuevas cuestan
+    hits, misses = cache.hits, cache.misses
+    analyze_game("c", MOVES[:6] + ["f4"], max_depth=3, cache=cache)
+    assert cache.hits - hits >= 6 and 0 < cache.misses - misses <= 2
+    # otro presupuesto es otra clave
+    misses = cache.misses
+    analyze_game("d", MOVES[:2], max_depth=2, cache=cache)
+    assert cache.misses > misses
+    # con reloj no se guarda nada: el presupuesto de cada ply cambia en cada petición
+    stores = cache.stores
+    analyze_game("e", MOVES, time_ms=200, cache=cache)
+    assert cache.stores == stores
+
+def test_cache_lru_by_bytes_and_persistence(tmp_path):
+    cache = ResultCache(max_bytes=200)
+    for i in range(10):
+        cache.put(("search", i, ENGINE_VERSION), {"pv": ["d3"] * 5})
+    assert cache.bytes <= 200 and cache.evictions > 0
+    assert cache.get(("search", 0, ENGINE_VERSION)) is None
+    assert cache.get(("search", 9, ENGINE_VERSION)) == {"pv": ["d3"] * 5}
+    path = tmp_path / "cache.jsonl"
+    cache.put(("search", 99, ENGINE_VERSION - 1), 1)  # de otra versión del motor
+    n = cache.save(path)
+    loaded = ResultCache(path=path)
+    assert len(loaded) == n - 1 and loaded.get(("search", 9, ENGINE_VERSION)) == {"pv": ["d3"] * 5}
+    assert loaded.stats()["stores"] == 0
@@ -1,5 +1,13 @@
+import random
+import time
 import pytest
-from othello_engine import Board, BLACK, WHITE, move_to_coords, coords_to_move, find_best_move
+import othello_engine
+from othello_engine import (Board, BLACK, WHITE, move_to_coords, coords_to_move, find_best_move,
+                            analyze_game, ASPIRATION_WINDOW, BACKENDS, board_after_moves,
+                            BOARD_INTERFACE, CancelToken, get_backend, negamax, new_board, perft,
+                            search, SearchCancelled, solve_endgame, SQUARE_RAYS, TranspositionTable)
+from othello_listboard import ListBoard
+from bench_perft import PERFT_POSITIONS, position, run
 
 def test_move_conversion():
     assert move_to_coords("d3") == (2,3)
@@ -30,3 +38,347 @@ def test_find_best_move_returns_valid():
     assert move in b.legal_moves(BLACK) or move is None
     assert isinstance(pv, list)
     assert isinstance(val, (int,float))
+
+def test_bitboard_matches_matrix_view():
+    rng = random.Random(7)
+    for _ in range(20):
+        b = Board()
+        player = BLACK
+        while not b.is_terminal():
+            moves = b.legal_moves_coords(player)
+            if moves:
+                r, c = rng.choice(moves)
+                assert b.apply_move_coords(r, c, player)
+            player = -player
+            clone = Board.from_matrix(b.to_matrix())
+            assert clone.legal_moves(player) == b.legal_moves(player)
+            assert clone.counts() == b.counts()
+        counts = b.counts()
+        assert counts == {"black": sum(r.count(BLACK) for r in b.b),
+                          "white": sum(r.count(WHITE) for r in b.b)}
+
+def test_illegal_move_rejected():
+    b = Board()
+    assert not b.apply_move("a1", BLACK)
+    assert not b.apply_move("d4", BLACK)
+    assert b.counts() == {"black": 2, "white": 2}
+
+def test_make_undo_restores_position():
+    b = Board()
+    before = b.to_matrix()
+    flips = b.make_move(2, 3, BLACK)
+    assert flips
+    assert b.counts() == {"black": 4, "white": 1}
+    assert b.make_move(2, 2, WHITE)
+    b.undo_move()
+    b.undo_move()
+    assert b.to_matrix() == before
+    assert not b.make_move(0, 0, BLACK)
+
+def test_find_best_move_leaves_board_untouched():
+    b = Board()
+    before = b.to_matrix()
+    find_best_move(b, BLACK, max_depth=3)
+    assert b.to_matrix() == before
+
+def test_zobrist_hash_incremental():
+    b = Board()
+    start = b.hash
+    b.make_move(2, 3, BLACK)
+    assert b.hash == Board.from_matrix(b.to_matrix()).hash
+    b.undo_move()
+    assert b.hash == start
+    assert b.key(BLACK) != b.key(WHITE)
+
+def test_transposition_table_same_result_and_counters():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3"])
+    plain = negamax(b, 4, BLACK, -1e9, 1e9)[0]
+    tt = TranspositionTable(size=1000)
+    assert tt.size == 1024
+    assert negamax(b, 4, BLACK, -1e9, 1e9, tt)[0] == plain
+    stats = tt.stats()
+    assert stats["stores"] > 0 and stats["misses"] > 0
+    # segunda búsqueda: la raíz sale directa de la tabla
+    assert negamax(b, 4, BLACK, -1e9, 1e9, tt)[0] == plain
+    assert tt.stats()["hits"] > stats["hits"]
+
+def test_search_respects_node_budget():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3"])
+    res = search(b, BLACK, max_depth=20, max_nodes=2000)
+    assert 1 <= res["depth"] < 20
+    assert not res["complete"]
+    assert res["nodes"] <= 2001
+    assert res["move"] in b.legal_moves(BLACK)
+    assert res["pv"][0] == res["move"]
+
+def test_search_depth_zero_is_static_evaluation():
+    b = board_after_moves(["d3", "c5", "f6"])
+    assert find_best_move(b, WHITE, 0) == (None, [], WHITE*b.evaluate())
+    assert search(b, WHITE, -2)["score"] == WHITE*b.evaluate()
+    res = analyze_game("g", ["d3", "c5", "f6"], max_depth=0)  # se busca al menos a profundidad 1
+    assert all(a["best_move"] is not None for a in res["analysis"])
+
+def test_search_time_budget_reaches_max_depth_when_cheap():
+    res = search(Board(), BLACK, max_depth=3, time_ms=10000)
+    assert res["depth"] == 3 and res["complete"]
+    assert res["score"] == find_best_move(Board(), BLACK, max_depth=3)[2]
+
+def test_move_ordering_same_score_fewer_nodes():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4"])
+    plain = search(b, BLACK, 5, ordering=False)
+    ordered = search(b, BLACK, 5)
+    assert ordered["score"] == plain["score"]
+    assert ordered["nodes"] < plain["nodes"]
+
+def test_pvs_and_aspiration_match_alphabeta():
+    for moves, player in (([], BLACK), (["d3", "c5", "f6", "f5", "e6", "e3", "c3"], WHITE)):
+        b = board_after_moves(moves)
+        for depth in (3, 4, 5):
+            ref = search(b, player, depth)["score"]
+            assert search(b, player, depth, pvs=True)["score"] == ref
+            assert search(b, player, depth, aspiration=ASPIRATION_WINDOW)["score"] == ref
+            assert search(b, player, depth, pvs=True, aspiration=1)["score"] == ref
+
+def test_ray_tables_flat_board_matches_bitboard():
+    assert len(SQUARE_RAYS) == 64 and len(SQUARE_RAYS[0]) == 3  # a1: este, sur, diagonal
+    rng = random.Random(11)
+    for _ in range(10):
+        b, flat, player = Board(), ListBoard(), BLACK
+        while not b.is_terminal():
+            moves = b.legal_moves_coords(player)
+            assert flat.legal_moves_coords(player) == moves
+            assert all(b.is_legal(r, c, player) == ((r, c) in moves)
+                       for r in range(8) for c in range(8))
+            if moves:
+                r, c = rng.choice(moves)
+                b.apply_move_coords(r, c, player)
+                flat.apply_move_coords(r, c, player)
+                assert flat.to_matrix() == b.to_matrix()
+            player = -player
+
+def test_leaf_generates_moves_once_per_colour(monkeypatch):
+    calls = []
+    real = othello_engine.moves_mask
+    monkeypatch.setattr(othello_engine, "moves_mask", lambda own, opp: calls.append(1) or real(own, opp))
+    b = Board()
+    b.make_move(2, 3, BLACK)
+    b.is_terminal(); b.legal_moves_coords(WHITE); b.evaluate()
+    assert len(calls) == 2
+    b.undo_move()
+    b.evaluate()
+    assert len(calls) == 4
+
+def test_flat_board_incremental_counts():
+    b = ListBoard()
+    b.make_move(2, 3, BLACK)
+    assert b.counts() == {"black": 4, "white": 1}
+    b.undo_move()
+    assert b.counts() == {"black": 2, "white": 2}
+
+def _random_position(rng, empties):
+    while True:
+        b, player = Board(), BLACK
+        while 64 - sum(b.counts().values()) > empties and not b.is_terminal():
+            moves = b.legal_moves_coords(player)
+            if moves:
+                b.apply_move_coords(*rng.choice(moves), player)
+            player = -player
+        if 64 - sum(b.counts().values()) == empties:
+            return b, player
+
+def _brute_force_score(b, player, passed=False):
+    moves = b.legal_moves_coords(player)
+    if not moves:
+        if passed:
+            c = b.counts()
+            own, opp = (c["black"], c["white"]) if player == BLACK else (c["white"], c["black"])
+            empty = 64 - own - opp
+            return own - opp + (empty if own > opp else -empty if own < opp else 0)
+        return -_brute_force_score(b, -player, True)
+    best = -99
+    for r, c in moves:
+        b.make_move(r, c, player)
+        best = max(best, -_brute_force_score(b, -player))
+        b.undo_move()
+    return best
+
+def test_endgame_solver_matches_brute_force():
+    rng = random.Random(21)
+    for empties in (1, 2, 3, 4, 6):
+        for _ in range(5):
+            b, player = _random_position(rng, empties)
+            exact = _brute_force_score(b, player)
+            assert solve_endgame(b, player)["score"] == exact
+            wld = solve_endgame(b, player, mode="wld")["score"]
+            assert wld == (exact > 0) - (exact < 0)
+
+def test_search_switches_to_solver_near_the_end():
+    b, player = _random_position(random.Random(3), 8)
+    res = search(b, player, max_depth=2, endgame_empties=10)
+    assert res["solved"] and res["depth"] == 8
+    assert res["score"] == _brute_force_score(b, player)
+    assert not search(b, player, max_depth=2, endgame_empties=0)["solved"]
+
+def test_parallel_root_search_matches_serial():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4"])
+    serial = search(b, BLACK, 4)
+    parallel = search(b, BLACK, 4, workers=2)
+    assert parallel["score"] == serial["score"]
+    assert parallel["move"] in b.legal_moves(BLACK)
+    assert search(b, BLACK, 4, workers=2)["move"] == parallel["move"]  # determinista
+    assert search(b, BLACK, 4, workers=2, deterministic=False)["score"] == serial["score"]
+
+def test_parallel_search_repeats_after_unrelated_searches():
+    # las TT de los trabajadores no arrastran entradas (más profundas) de búsquedas anteriores
+    b = board_after_moves(["c4", "e3", "f6", "e6", "f5", "c5", "f4", "g6", "f7", "d3", "f3", "g5",
+                           "g4", "e7", "c6", "d6"])
+    serial = search(b, BLACK, 4, tt=TranspositionTable())
+    other = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3"])
+    for depth in (5, 6, 5):
+        search(b, BLACK, depth, workers=2)
+        search(other, WHITE, 4, workers=2)
+        res = search(b, BLACK, 4, workers=2, tt=TranspositionTable())
+        assert (res["move"], res["score"]) == (serial["move"], serial["score"])
+
+def test_analyze_game_scores_every_ply():
+    rng = random.Random(8)
+    b, player, moves = Board(), BLACK, []
+    while not b.is_terminal():
+        legal = b.legal_moves(player)
+        if legal:
+            moves.append(rng.choice(legal)); b.apply_move(moves[-1], player)
+        player = -player
+    tt = TranspositionTable(1 << 14)
+    res = analyze_game("g", moves, max_depth=2, tt=tt, endgame_empties=6)
+    plies, summary = res["analysis"], res["summary"]
+    assert len(plies) == len(moves) == summary["analyzed"]
+    assert res["counts"] == b.counts() and res["best_move"] is None
+    errors = [a for a in plies if a["label"]]
+    assert summary["errors_count"] == len(errors) > 0
+    assert summary["first_error_index"] == errors[0]["index"]
+    assert all(a["loss"] == max(a["best_score"] - a["score"], 0) for a in plies)
+    assert tt.stats()["hits"] > 0  # la tabla se reutiliza entre plies
+    # en las posiciones resueltas el score de la jugada hecha es exacto
+    replay, player = Board(), BLACK
+    for a in plies:
+        player = BLACK if a["player"] == "B" else WHITE
+        if a["solved"]:
+            replay.make_move(*move_to_coords(a["move"]), player)
+            assert a["score"] == -_brute_force_score(replay, -player)
+            replay.undo_move()
+        replay.apply_move(a["move"], player)
+
+def test_analyze_game_stops_at_illegal_move():
+    res = analyze_game("g", ["d3", "c5", "a1", "f6"], max_depth=1)
+    assert res["summary"]["invalid_move_index"] == 2 and len(res["analysis"]) == 2
+    assert res["current_player"] == "B"
+
+def test_analyze_game_normalizes_move_tokens():
+    lower = analyze_game("g", ["d3", "c5", "f6"], max_depth=2)
+    upper = analyze_game("g", ["D3", " c5", "F6"], max_depth=2)
+    assert upper["analysis"] == lower["analysis"]
+    assert upper["summary"]["nodes"] == lower["summary"]["nodes"]
+
+def test_analyze_game_stops_at_malformed_move():
+    res = analyze_game("g", ["d3", "c5", "x"], max_depth=1)
+    assert res["summary"]["invalid_move_index"] == 2 and len(res["analysis"]) == 2
+
+def test_backends_give_identical_searches():
+    assert get_backend("list") is ListBoard and get_backend("bitboard") is Board
+    for name in BACKENDS:
+        assert all(hasattr(new_board(name), attr) for attr in BOARD_INTERFACE)
+    with pytest.raises(ValueError):
+        get_backend("nope")
+    for moves, player in (([], BLACK), (["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3"], BLACK)):
+        fast, ref = new_board("bitboard"), new_board("list")
+        for i, mv in enumerate(moves):
+            fast.apply_move(mv, BLACK if i % 2 == 0 else WHITE)
+            ref.apply_move(mv, BLACK if i % 2 == 0 else WHITE)
+        assert ref.key(player) == fast.key(player) and ref.key(WHITE) == fast.key(WHITE)
+        assert ref.evaluate() == fast.evaluate()
+        a, b = search(fast, player, 4), search(ref, player, 4)
+        assert (a["score"], a["move"], a["nodes"]) == (b["score"], b["move"], b["nodes"])
+
+def test_list_backend_endgame_and_pass_handling():
+    b, player = _random_position(random.Random(5), 8)
+    ref = ListBoard.from_bitboards(b.black, b.white)
+    assert search(ref, player, 2)["score"] == search(b, player, 2)["score"]
+    assert search(ref, player, 3, endgame_empties=0)["score"] == search(b, player, 3, endgame_empties=0)["score"]
+    res = analyze_game("g", ["d3", "c5", "f6"], max_depth=2, backend="list")
+    assert res == analyze_game("g", ["d3", "c5", "f6"], max_depth=2)
+
+def test_perft_reference_counts_on_every_backend():
+    for backend in BACKENDS:
+        for name, (moves, expected) in PERFT_POSITIONS.items():
+            board, player = position(moves, backend)
+            depth = min(4, len(expected))
+            assert perft(board, player, depth) == expected[depth-1], (backend, name)
+    result = run(["bitboard"], perft_depth=3, search_depth=2)["backends"]["bitboard"]
+    assert result["perft_ok"] and result["search_nodes"] > 0
+
+def test_search_and_analysis_stats():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4"])
+    tt = TranspositionTable()
+    st = search(b, BLACK, 4, tt=tt)["stats"]
+    assert st["nodes"] > st["leaf_evals"] > 0 and st["cutoffs"] > 0 and st["depth"] == 4
+    assert st["tt_hits"] > 0 and st["elapsed_ms"] > 0 and st["nps"] > 0
+    assert search(b, BLACK, 4, workers=2)["stats"]["leaf_evals"] > 0
+    res = analyze_game("g", ["d3", "c5", "f6"], max_depth=2, stats=True)
+    assert res["stats"]["searches"] == 4 and res["stats"]["nodes"] >= res["summary"]["nodes"]
+    assert "stats" not in analyze_game("g", ["d3"], max_depth=1)
+
+def test_search_cancellation():
+    b, player = _random_position(random.Random(7), 10)
+    token = CancelToken(); token.cancel()
+    for workers in (1, 2):
+        with pytest.raises(SearchCancelled):
+            search(b, player, 8, workers=workers, cancel=token)
+    t0 = time.perf_counter()
+    with pytest.raises(SearchCancelled):
+        search(b, player, 12, endgame_empties=0, cancel=CancelToken(deadline_ms=50))
+    assert time.perf_counter() - t0 < 2
+    with pytest.raises(SearchCancelled):
+        analyze_game("g", ["d3", "c5"], max_depth=6, cancel=token)
+    assert search(b, player, 2, cancel=CancelToken(deadline_ms=60000))["move"] is not None
+
+def test_parallel_search_waiting_for_the_pool_can_be_cancelled():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4"])
+    lock = othello_engine.get_search_pool(2)[2]
+    with lock:  # otra búsqueda ocupa el pool
+        t0 = time.perf_counter()
+        with pytest.raises(SearchCancelled):
+            search(b, BLACK, 6, workers=2, cancel=CancelToken(200))
+        res = search(b, BLACK, 6, workers=2, time_ms=200)
+        assert time.perf_counter() - t0 < 2 and res["depth"] < 6 and res["move"]
+
+def test_multipv_scores_match_separate_searches():
+    b = board_after_moves(["d3", "c5", "f6", "f5", "e6", "e3", "c3", "f3", "c4", "b4"])
+    res = search(b, BLACK, 4, multipv=3)
+    lines = res["multipv"]
+    assert len(lines) == 3 and res["score"] == search(b, BLACK, 4)["score"] == lines[0]["score"]
+    assert [l["score"] for l in lines] == sorted((l["score"] for l in lines), reverse=True)
+    for line in lines:
+        child = b.copy(); child.apply_move(line["move"], BLACK)
+        assert line["pv"][0] == line["move"]
+        assert line["score"] == -search(child, WHITE, 3)["score"]
+    # final exacto: los k mejores con score exacto
+    end, player = _random_position(random.Random(3), 8)
+    for mode in ("exact", "wld"):
+        lines = search(end, player, 4, multipv=2, endgame_mode=mode)["multipv"]
+        for line in lines:
+            child = end.copy(); child.apply_move(line["move"], player)
+            assert line["score"] == -search(child, -player, 4, endgame_mode=mode)["score"]
+    res = analyze_game("g", ["d3", "c5", "f6"], max_depth=2, multipv=2)
+    assert all(len(a["alternatives"]) == 2 for a in res["analysis"]) and len(res["alternatives"]) == 2
+    assert "alternatives" not in analyze_game("g", ["d3"], max_depth=1)
+
+def test_analyze_game_time_budget_covers_the_whole_request():
+    rng, b, player, moves = random.Random(1), Board(), BLACK, []
+    while len(moves) < 30 and not b.is_terminal():
+        legal = b.legal_moves(player)
+        if not legal: player = -player; continue
+        mv = rng.choice(legal); b.apply_move(mv, player); moves.append(mv); player = -player
+    t0 = time.perf_counter()
+    res = analyze_game("g", moves, max_depth=60, time_ms=300)
+    assert time.perf_counter() - t0 < 1.5
+    assert res["summary"]["analyzed"] == len(moves) and all(a["score"] is not None for a in res["analysis"])
@@ -0,0 +1,39 @@
+import json
+
+from othello_record import (PASS, convert, decode_moves, encode_moves, is_record_file, load_game,
+                            read_game_file, read_games, save_game, write_games)
+from selfplay import format_game, play_game
+
+def test_encode_decode_moves():
+    moves = ["d3", "c5", "pass", "h8", "a1"]
+    data = encode_moves(moves)
+    assert len(data) == len(moves) and data[2] == PASS
+    assert decode_moves(data) == moves
+
+def test_write_and_read_with_result(tmp_path):
+    games = [play_game(i) for i in range(5)]
+    path = tmp_path / "games.ogr"
+    assert write_games(path, [{"moves": m, "metadata": {"i": i}} for i, (m, _, _) in enumerate(games[:3])]) == 3
+    write_games(path, [m for m, _, _ in games[3:]], append=True)
+    read = list(read_games(path))
+    assert [g["moves"] for g in read] == [m for m, _, _ in games]
+    assert [(g["result"]["black"], g["result"]["white"]) for g in read] == [(b, w) for _, b, w in games]
+    assert all(g["result"]["finished"] for g in read)
+    assert read[1]["metadata"] == {"i": 1} and read[4]["metadata"] == {}
+    assert load_game(path, 4)["moves"] == games[4][0]
+    assert [g["metadata"] for g in read_games(path, skip=2)][0] == {"i": 2}
+
+def test_convert_json_lines_and_selfplay(tmp_path):
+    moves, black, white = play_game(3)
+    (tmp_path / "g.json").write_text(json.dumps({"moves": moves[:10], "metadata": {"a": 1}}, indent=2))
+    (tmp_path / "g.txt").write_text("# partida\n" + "\n".join(moves[:6]) + "\n")
+    (tmp_path / "s.txt").write_text(format_game(moves, black, white) * 2)
+    out = tmp_path / "all.ogr"
+    assert convert([tmp_path / "g.json", tmp_path / "g.txt", tmp_path / "s.txt"], out) == 4
+    assert is_record_file(out)
+    games = read_game_file(out)
+    assert [len(g["moves"]) for g in games] == [10, 6, len(moves), len(moves)]
+    assert games[0]["metadata"] == {"a": 1, "source": "g.json"}
+    assert not games[1]["result"]["finished"] and games[3]["result"]["black"] == black
+    save_game(tmp_path / "one.ogr", moves)
+    assert (tmp_path / "one.ogr").stat().st_size < len(json.dumps({"moves": moves}))
@@ -0,0 +1,39 @@
+import pytest
+from othello_store import GameStore
+
+MOVES = ["d3", "c5", "f6", "f5", "pass", "e6"]
+
+def test_store_roundtrip_and_lazy_analysis(tmp_path):
+    db = tmp_path / "games.sqlite3"
+    store = GameStore(db, hot_size=2)
+    store.add("g1", MOVES, {"event": "club", "round": 3}, source="local")
+    store.add("g2", ["zz", "d3"], source="analyze_game")  # jugadas que no son casillas
+    store.add("g3", ["d3", "B"])
+    assert "g1" in store and "nope" not in store and len(store) == 3
+    assert store.analysis("g1") is None
+    store.set_analysis("g1", {"summary": {"errors_count": 1}})
+    with pytest.raises(KeyError):
+        store.set_analysis("nope", {})
+    # otro proceso / reinicio: nada se carga hasta pedirlo
+    store.close()
+    reopened = GameStore(db, hot_size=2)
+    assert reopened.stats()["hot_entries"] == 0
+    g1 = reopened.get("g1")
+    assert g1["moves"] == MOVES and g1["metadata"] == {"event": "club", "round": 3}
+    assert "analysis" not in g1 and reopened.analysis("g1") == {"summary": {"errors_count": 1}}
+    assert reopened.get("g2")["moves"] == ["zz", "d3"] and reopened.get("nope") is None
+    assert reopened.get("g1") is g1 and reopened.hits == 1
+    assert reopened.get("g3")["moves"] == ["d3", "B"]  # token de un carácter: JSON
+
+def test_store_hot_cache_is_bounded_and_find_uses_indexes(tmp_path):
+    store = GameStore(tmp_path / "games.sqlite3", hot_size=3)
+    n = store.add_many({"game_id": f"g{i}", "moves": MOVES[:i % 4], "created": f"2025-01-{i+1:02d}",
+                        "metadata": {"parity": i % 2}, "source": "selfplay" if i < 5 else "local"}
+                       for i in range(10))
+    assert n == 10 and store.stats()["hot_entries"] == 3
+    for i in range(10): store.get(f"g{i}")
+    assert store.stats()["hot_entries"] == 3
+    found = store.find(created_after="2025-01-03", created_before="2025-01-08", metadata={"parity": 0})
+    assert [g["game_id"] for g in found] == ["g6", "g4", "g2"]
+    assert [g["game_id"] for g in store.find(source="local", limit=2)] == ["g9", "g8"]
+    assert store.find(metadata={"parity": 1}, limit=1, offset=1)[0]["game_id"] == "g7"
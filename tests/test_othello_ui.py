@@ -1,5 +1,5 @@
 import pytest
-from othello_engine import Board, BLACK
+from othello_engine import Board, BLACK, search
 from othello_ui_interactive import OthelloUIInteractive
 from othello_engine_adapter import OthelloEngineInteractive
 
@@ -11,3 +11,19 @@ def test_ui_initialization():
     matrix = engine.board.to_matrix()
     assert len(matrix) == 8
     assert all(len(row) == 8 for row in matrix)
+
+def test_pondering_caches_the_reply():
+    engine = OthelloEngineInteractive(ponder=True, ponder_depth=4)
+    first = engine.get_pv(max_depth=3)
+    engine.start_pondering()
+    engine._ponder_thread.join(30)
+    engine.apply_move(first[0])
+    hits = engine.ponder_hits
+    pv = engine.get_pv(max_depth=4)
+    assert engine.ponder_hits == hits + 1
+    ref = search(engine.board, engine.current_color, 4)
+    assert pv[0] == ref["move"]
+    # stop_pondering cancela la búsqueda en curso y espera al hilo
+    engine.start_pondering()
+    engine.stop_pondering()
+    assert engine._ponder_thread is None
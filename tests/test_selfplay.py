@@ -0,0 +1,34 @@
+from othello_engine import Board, BLACK
+from selfplay import generate, play_game, read_games, format_game, parse_game
+
+def _replay(moves):
+    b, player = Board(), BLACK
+    for mv in moves:
+        if not b.has_any_move(player): player = -player
+        assert b.apply_move(mv, player), mv
+        player = -player
+    assert b.is_terminal()
+    return b.counts()
+
+def test_random_games_are_legal_and_seeded():
+    moves, black, white = play_game(7)
+    assert _replay(moves) == {"black": black, "white": white}
+    assert play_game(7) == (moves, black, white)
+    assert play_game(8) != (moves, black, white)
+    assert parse_game(format_game(moves, black, white)) == (moves, black, white)
+
+def test_engine_and_epsilon_games():
+    engine = play_game(1, depths=(2, 1), random_plies=2, endgame_empties=0)
+    assert _replay(engine[0]) == {"black": engine[1], "white": engine[2]}
+    assert play_game(1, depths=(2, 1), random_plies=2, endgame_empties=0) == engine
+    eps = play_game(1, depths=(1, 1), epsilon=0.5, endgame_empties=0)
+    assert _replay(eps[0]) == {"black": eps[1], "white": eps[2]}
+
+def test_generate_appends_same_file_for_any_worker_count(tmp_path):
+    serial, parallel = tmp_path / "a.txt", tmp_path / "b.txt"
+    assert generate(serial, 70, seed=3) == 70
+    assert generate(parallel, 40, seed=3, workers=2) == 40
+    generate(parallel, 30, seed=3, start=40, workers=2)  # continuación en el mismo archivo
+    assert serial.read_text() == parallel.read_text()
+    games = list(read_games(serial))
+    assert len(games) == 70 and games[0] == play_game(3 << 32)